@@ -0,0 +1,180 @@
+from itertools import chain
+from typing import List
+
+import numpy as np
+
+from release import Release
+from task import Task, MAX_PRIORITY
+from solution import Solution
+from programmer import PROGRAMMING_HOURS_IN_WORK_DAY
+from task_table import TaskTable
+from algorithms.fitness_function import DEPENDENCY_PENALTY, OVERFLOW_PENALTY, IMBALANCE_WEIGHT
+from algorithms.fitness_cache import FitnessCache, PlanEvaluation, ProgrammerCache, active_key, genome_key, plan_key
+
+
+def batch_fitness_function(population: List[Solution], tasks: List[Task], releases: List[Release],
+                           active_ids=None, table: TaskTable = None, cache: FitnessCache = None,
+                           programmer_cache: ProgrammerCache = None, executor=None) -> np.ndarray:
+    """
+    Vectorised version of fitness_function that scores a whole population at once.
+
+    All work plans are concatenated into one flat array, so the release assignment, overflow,
+    dependency violations and workload imbalance of every individual come from a handful of
+    NumPy operations. Gives the same numbers as fitness_function (up to float rounding).
+    Pass a prebuilt table to avoid rebuilding it from tasks on every call. With a cache,
+    individuals whose genome was scored before (or appears twice in population) are not
+    evaluated again; with a programmer_cache, neither are single programmers whose plan was.
+    An executor (algorithms.parallel.ParallelEvaluator) scores the individuals in worker
+    processes instead, the programmer_cache is not used then.
+    """
+    if table is None:
+        table = TaskTable.from_tasks(tasks)
+
+    def evaluate(individuals: List[Solution]) -> np.ndarray:
+        if executor is not None:
+            return executor.evaluate(individuals, active_ids)
+        return _evaluate(individuals, releases, active_ids, table, programmer_cache)
+
+    if cache is None:
+        return evaluate(population)
+
+    active = active_key(active_ids)
+    fitness = np.empty(len(population))
+    missing = {}
+    for i, individual in enumerate(population):
+        key = genome_key(individual, active)
+        if key in missing:
+            cache.hits += 1
+            missing[key].append(i)
+            continue
+        fit = cache.get(key)
+        if fit is None:
+            missing[key] = [i]
+        else:
+            fitness[i] = fit
+    if missing:
+        values = evaluate([population[indices[0]] for indices in missing.values()])
+        for (key, indices), value in zip(missing.items(), values.tolist()):
+            cache.put(key, value)
+            fitness[indices] = value
+    return fitness
+
+
+def _evaluate(population: List[Solution], releases: List[Release], active_ids, table: TaskTable,
+              programmer_cache: ProgrammerCache = None) -> np.ndarray:
+    num_individuals = len(population)
+    if num_individuals == 0:
+        return np.zeros(0)
+    num_releases = len(releases)
+    capacity = np.cumsum([r.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60 for r in releases])
+
+    # One segment per (individual, programmer) pair
+    programmers = [p for individual in population for p in individual.programmers]
+    owner = np.repeat(np.arange(num_individuals), [len(individual.programmers) for individual in population])
+    num_segments = len(programmers)
+    efficiency = np.fromiter((p.efficiency for p in programmers), dtype=np.float64, count=num_segments)
+
+    # With a programmer cache only plans that were not evaluated before are simulated,
+    # and each of them once even if several individuals share it
+    evaluations = [None] * num_segments
+    simulate = list(range(num_segments))
+    keys = None
+    if programmer_cache is not None:
+        active = active_key(active_ids)
+        keys = [plan_key(p, active) for p in programmers]
+        pending = set()
+        simulate = []
+        for s, key in enumerate(keys):
+            if key in pending:
+                programmer_cache.hits += 1
+                continue
+            evaluations[s] = programmer_cache.get(key)
+            if evaluations[s] is None:
+                pending.add(key)
+                simulate.append(s)
+
+    task_release = np.full((num_individuals, table.num_tasks), num_releases, dtype=np.int16)
+    priority_per_release = np.zeros((num_segments, num_releases), dtype=np.int64)
+    overflowing = np.zeros(num_segments, dtype=bool)
+    assigned_times = np.zeros(num_segments)
+
+    if simulate:
+        plans = [programmers[s].work_plan for s in simulate]
+        lengths = np.fromiter((len(plan) for plan in plans), dtype=np.int64, count=len(plans))
+        sim_efficiency = efficiency[simulate]
+        flat = np.fromiter(chain.from_iterable(plans), dtype=np.int64, count=int(lengths.sum()))
+        segment = np.repeat(np.arange(len(plans)), lengths)
+        if active_ids is not None:
+            # inactive tasks take no time and score nothing, so the plans are compacted to
+            # their active tasks before anything else is computed
+            active = table.active_mask(active_ids)[flat]
+            flat = flat[active]
+            segment = segment[active]
+            lengths = np.bincount(segment, minlength=len(plans))
+
+        # Cumulative cost of every plan prefix
+        cost = table.cost[flat]
+        cumulative = np.cumsum(cost)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        base = np.concatenate(([0], cumulative))[starts]
+        load = (cumulative - np.repeat(base, lengths)) / sim_efficiency[segment]
+
+        # A task lands in the first release whose cumulative capacity covers its prefix;
+        # num_releases means it did not fit at all
+        release = np.searchsorted(capacity, load, side="left")
+        assigned = release < num_releases
+
+        value = np.where(assigned, MAX_PRIORITY + 1 - table.priority[flat], 0)
+        sim_priority = np.bincount(segment * (num_releases + 1) + release, weights=value,
+                                   minlength=len(plans) * (num_releases + 1))
+        sim_priority = sim_priority.reshape(len(plans), num_releases + 1)[:, :num_releases].astype(np.int64)
+        sim_overflowing = np.bincount(segment, weights=~assigned, minlength=len(plans)) > 0
+        sim_assigned = np.bincount(segment, weights=np.where(assigned, cost, 0), minlength=len(plans)) / sim_efficiency
+
+        priority_per_release[simulate] = sim_priority
+        overflowing[simulate] = sim_overflowing
+        assigned_times[simulate] = sim_assigned
+        assigned_segment = segment[assigned]
+        assigned_tasks = flat[assigned]
+        assigned_releases = release[assigned]
+        task_release[owner[np.asarray(simulate)[assigned_segment]], assigned_tasks] = assigned_releases
+
+        if programmer_cache is not None:
+            bounds = np.searchsorted(assigned_segment, np.arange(len(plans) + 1))
+            for k, s in enumerate(simulate):
+                evaluations[s] = PlanEvaluation(
+                    priority_per_release=sim_priority[k].tolist(),
+                    time_left=float(capacity[-1] - sim_assigned[k]) if num_releases else 0.0,
+                    overflowing=bool(sim_overflowing[k]),
+                    assigned_time=float(sim_assigned[k]),
+                    task_ids=assigned_tasks[bounds[k]:bounds[k + 1]].astype(np.int32),
+                    task_releases=assigned_releases[bounds[k]:bounds[k + 1]].astype(np.int16),
+                )
+                programmer_cache.put(keys[s], evaluations[s])
+
+    if programmer_cache is not None:
+        simulated = set(simulate)
+        by_key = {keys[s]: evaluations[s] for s in simulate}
+        for s, key in enumerate(keys):
+            if s in simulated:
+                continue
+            evaluation = evaluations[s] if evaluations[s] is not None else by_key[key]
+            priority_per_release[s] = evaluation.priority_per_release
+            overflowing[s] = evaluation.overflowing
+            assigned_times[s] = evaluation.assigned_time
+            task_release[owner[s], evaluation.task_ids] = evaluation.task_releases
+
+    release_weight = 2 ** np.arange(num_releases, 0, -1)
+    fitness = np.bincount(owner, weights=priority_per_release @ release_weight, minlength=num_individuals)
+    fitness -= OVERFLOW_PENALTY * np.bincount(owner, weights=overflowing, minlength=num_individuals)
+
+    # Dependency violations: release of every task per individual, unassigned = num_releases
+    fitness -= DEPENDENCY_PENALTY * table.dependencies.count_violations_batch(task_release, num_releases)
+
+    # Sample standard deviation of assigned minutes between each individual's programmers
+    team_size = np.bincount(owner, minlength=num_individuals)
+    mean = np.bincount(owner, weights=assigned_times, minlength=num_individuals) / team_size
+    squares = np.bincount(owner, weights=(assigned_times - mean[owner]) ** 2, minlength=num_individuals)
+    fitness -= IMBALANCE_WEIGHT * np.sqrt(squares / (team_size - 1))
+
+    return fitness
@@ -0,0 +1,270 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from statistics import stdev
+from typing import Dict, List
+
+from release import Release
+from task import Task, MAX_PRIORITY
+from solution import Solution
+from programmer import PROGRAMMING_HOURS_IN_WORK_DAY
+from dependency_index import DependencyIndex
+from task_table import TaskTable
+from algorithms.fitness_function import DEPENDENCY_PENALTY, OVERFLOW_PENALTY, IMBALANCE_WEIGHT
+from algorithms.moves import BlockMove, Move, Relocate, Swap
+
+
+@dataclass
+class Delta:
+    """
+    A scored change to the evaluated solution that has not been applied yet.
+
+    Attributes:
+        fitness: Fitness the solution would have after the change.
+        move: The Move scored, applied to the solution on commit.
+        cumulative: New prefix costs per touched programmer, as (start, stop, values) replacing
+            the positions start..stop of its current prefix costs.
+        releases: New release of every task whose release changes.
+        score / assigned: New per-programmer totals of the touched programmers.
+        dep_violations: New global number of dependency violations.
+    """
+    fitness: float
+    move: Move = None
+    cumulative: Dict[int, tuple] = field(default_factory=dict)
+    releases: Dict[int, int] = field(default_factory=dict)
+    score: Dict[int, int] = field(default_factory=dict)
+    assigned: Dict[int, int] = field(default_factory=dict)
+    dep_violations: int = 0
+
+
+class DeltaEvaluator:
+    """
+    Keeps the evaluation state of one solution so that swap, move and block-move neighbours can be
+    scored by re-simulating only the touched programmers from the first changed position.
+    Fitness values are the same as fitness_function gives for the changed solution.
+    Task data is read from table, which is built from tasks when not given.
+    """
+
+    def __init__(self, solution: Solution, tasks: List[Task], releases: List[Release], active_ids=None,
+                 dep_index: DependencyIndex = None, table: TaskTable = None):
+        self.solution = solution
+        self.num_releases = len(releases)
+        self.capacity = []
+        total = 0
+        for release in releases:
+            total += release.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60
+            self.capacity.append(total)
+        # weight of a task finished in release i, num_releases = not finished
+        self.release_weight = [2 ** (self.num_releases - i) for i in range(self.num_releases)] + [0]
+
+        if table is None:
+            table = TaskTable.from_tasks(tasks, dep_index)
+        num_tasks = table.num_tasks
+        self.cost = table.cost.tolist()
+        self.value = (MAX_PRIORITY + 1 - table.priority).tolist()
+        self.active = [active_ids is None] * num_tasks
+        self.dep_index = table.dependencies
+        self.dep_ptr, self.dep_ids, self.rev_ptr, self.rev_ids = self.dep_index.lists
+        if active_ids is not None:
+            for task_id in active_ids:
+                self.active[task_id] = True
+
+        self.efficiency = [p.efficiency for p in solution.programmers]
+        self.task_release = [self.num_releases] * num_tasks
+        self.cumulative = []
+        self.score = []
+        self.assigned = []
+        for p, prog in enumerate(solution.programmers):
+            cumulative, task_releases = self._simulate(p, prog.work_plan, 0)
+            self.cumulative.append(cumulative)
+            score = 0
+            assigned = 0
+            for task_id, release in zip(prog.work_plan, task_releases):
+                self.task_release[task_id] = release
+                if release < self.num_releases:
+                    score += self.value[task_id] * self.release_weight[release]
+                    assigned += self.cost[task_id]
+            self.score.append(score)
+            self.assigned.append(assigned)
+
+        self.dep_violations = 0
+        for task_id, dep_id in self.dep_index.edge_list:
+            if self._violates(self.task_release[task_id], self.task_release[dep_id]):
+                self.dep_violations += 1
+        self.current_fitness = self._fitness(self.score, self.assigned, self.cumulative_ends(), self.dep_violations)
+
+    def cumulative_ends(self) -> List[int]:
+        return [c[-1] if c else 0 for c in self.cumulative]
+
+    def fitness(self) -> float:
+        return self.current_fitness
+
+    def _violates(self, task_release: int, dep_release: int) -> bool:
+        return task_release < self.num_releases and dep_release > task_release
+
+    def _simulate(self, p: int, plan: List[int], prev_cumulative: int):
+        """Prefix costs and releases of plan when it starts after prev_cumulative minutes of work."""
+        eff = self.efficiency[p]
+        capacity = self.capacity
+        cost = self.cost
+        active = self.active
+        cumulative = prev_cumulative
+        cumulatives = []
+        task_releases = []
+        for task_id in plan:
+            if active[task_id]:
+                cumulative += cost[task_id]
+                task_releases.append(bisect_left(capacity, cumulative / eff))
+            else:
+                task_releases.append(self.num_releases)
+            cumulatives.append(cumulative)
+        return cumulatives, task_releases
+
+    def _fitness(self, score, assigned, cumulative_ends, dep_violations) -> float:
+        fitness = sum(score)
+        for p, end in enumerate(cumulative_ends):
+            if self.capacity and end / self.efficiency[p] > self.capacity[-1]:
+                fitness -= OVERFLOW_PENALTY
+        fitness -= dep_violations * DEPENDENCY_PENALTY
+        fitness -= IMBALANCE_WEIGHT * stdev(a / e for a, e in zip(assigned, self.efficiency))
+        return fitness
+
+    def _score_change(self, delta: Delta, owners: Dict[int, tuple]) -> Delta:
+        """
+        Fill in score, assigned time and dependency violations of delta.
+        owners maps every re-simulated task to (old programmer, new programmer).
+        """
+        score = {}
+        assigned = {}
+        for p in {p for pair in owners.values() for p in pair}:
+            score[p] = self.score[p]
+            assigned[p] = self.assigned[p]
+        changed = delta.releases
+        for task_id, new_release in changed.items():
+            old_p, new_p = owners[task_id]
+            old_release = self.task_release[task_id]
+            score[old_p] -= self.value[task_id] * self.release_weight[old_release]
+            score[new_p] += self.value[task_id] * self.release_weight[new_release]
+            if old_release < self.num_releases:
+                assigned[old_p] -= self.cost[task_id]
+            if new_release < self.num_releases:
+                assigned[new_p] += self.cost[task_id]
+        # a moved task whose release stays the same still changes programmer
+        for task_id, (old_p, new_p) in owners.items():
+            if old_p != new_p and task_id not in changed:
+                release = self.task_release[task_id]
+                gain = self.value[task_id] * self.release_weight[release]
+                score[old_p] -= gain
+                score[new_p] += gain
+                if release < self.num_releases:
+                    assigned[old_p] -= self.cost[task_id]
+                    assigned[new_p] += self.cost[task_id]
+
+        dep_violations = self.dep_violations
+        task_release = self.task_release
+        for task_id, new_release in changed.items():
+            old_release = task_release[task_id]
+            for k in range(self.dep_ptr[task_id], self.dep_ptr[task_id + 1]):
+                dep_id = self.dep_ids[k]
+                dep_old = task_release[dep_id]
+                dep_violations -= self._violates(old_release, dep_old)
+                dep_violations += self._violates(new_release, changed.get(dep_id, dep_old))
+            for k in range(self.rev_ptr[task_id], self.rev_ptr[task_id + 1]):
+                parent_id = self.rev_ids[k]
+                if parent_id in changed:
+                    continue
+                parent_release = task_release[parent_id]
+                dep_violations -= self._violates(parent_release, old_release)
+                dep_violations += self._violates(parent_release, new_release)
+
+        delta.score = score
+        delta.assigned = assigned
+        delta.dep_violations = dep_violations
+        new_score = [score.get(p, s) for p, s in enumerate(self.score)]
+        new_assigned = [assigned.get(p, a) for p, a in enumerate(self.assigned)]
+        ends = self.cumulative_ends()
+        for p, (start, stop, values) in delta.cumulative.items():
+            if stop == len(self.cumulative[p]):
+                ends[p] = values[-1] if values else (self.cumulative[p][start - 1] if start > 0 else 0)
+        delta.fitness = self._fitness(new_score, new_assigned, ends, dep_violations)
+        return delta
+
+    def _changed_releases(self, plan: List[int], task_releases: List[int], releases: Dict[int, int]) -> None:
+        for task_id, release in zip(plan, task_releases):
+            if release != self.task_release[task_id]:
+                releases[task_id] = release
+
+    def evaluate_swap(self, p: int, idx1: int, idx2: int) -> Delta:
+        """Score swapping positions idx1 and idx2 in the work plan of programmer p."""
+        if idx1 > idx2:
+            idx1, idx2 = idx2, idx1
+        plan = self.solution.programmers[p].work_plan
+        move = Swap(p, idx1, idx2)
+
+        if idx1 == idx2:
+            return Delta(fitness=self.current_fitness, move=move, dep_violations=self.dep_violations)
+
+        # only positions idx1..idx2 change, the prefix sums after idx2 stay the same
+        segment = plan[idx1:idx2 + 1]
+        segment[0], segment[-1] = segment[-1], segment[0]
+        prev = self.cumulative[p][idx1 - 1] if idx1 > 0 else 0
+        cumulative, task_releases = self._simulate(p, segment, prev)
+        delta = Delta(fitness=0.0, move=move)
+        delta.cumulative[p] = (idx1, idx2 + 1, cumulative)
+        self._changed_releases(segment, task_releases, delta.releases)
+        return self._score_change(delta, {task_id: (p, p) for task_id in segment})
+
+    def evaluate_move(self, src: int, idx: int, dst: int, insert_idx: int) -> Delta:
+        """Score moving the task at position idx of programmer src to position insert_idx of programmer dst."""
+        delta = self.evaluate_block_move(src, idx, idx + 1, dst, insert_idx)
+        delta.move = Relocate(src, idx, dst, insert_idx)
+        return delta
+
+    def evaluate_block_move(self, src: int, start: int, stop: int, dst: int, insert_idx: int) -> Delta:
+        """
+        Score moving positions start..stop of programmer src, in order, to position insert_idx
+        of another programmer dst.
+        """
+        if src == dst:
+            raise ValueError("a block can only be moved to another programmer")
+        src_plan = self.solution.programmers[src].work_plan
+        dst_plan = self.solution.programmers[dst].work_plan
+        block = src_plan[start:stop]
+        delta = Delta(fitness=0.0, move=BlockMove(src, start, stop, dst, insert_idx))
+        owners = {}
+
+        src_tail = src_plan[stop:]
+        prev = self.cumulative[src][start - 1] if start > 0 else 0
+        cumulative, task_releases = self._simulate(src, src_tail, prev)
+        delta.cumulative[src] = (start, len(src_plan), cumulative)
+        self._changed_releases(src_tail, task_releases, delta.releases)
+        for t in src_tail:
+            owners[t] = (src, src)
+
+        dst_tail = block + dst_plan[insert_idx:]
+        prev = self.cumulative[dst][insert_idx - 1] if insert_idx > 0 else 0
+        cumulative, task_releases = self._simulate(dst, dst_tail, prev)
+        delta.cumulative[dst] = (insert_idx, len(dst_plan), cumulative)
+        self._changed_releases(dst_tail, task_releases, delta.releases)
+        for t in dst_tail:
+            owners[t] = (dst, dst)
+        for t in block:
+            owners[t] = (src, dst)
+        return self._score_change(delta, owners)
+
+    def evaluate(self, move) -> Delta:
+        """Score a Move of algorithms.moves (Swap, Relocate, BlockMove) without applying it."""
+        return move.score(self)
+
+    def commit(self, delta: Delta) -> None:
+        """Apply a delta returned by one of the evaluate methods to the solution and the state."""
+        delta.move.apply(self.solution)
+        for p, (start, stop, values) in delta.cumulative.items():
+            self.cumulative[p][start:stop] = values
+        for task_id, release in delta.releases.items():
+            self.task_release[task_id] = release
+        for p, score in delta.score.items():
+            self.score[p] = score
+        for p, assigned in delta.assigned.items():
+            self.assigned[p] = assigned
+        self.dep_violations = delta.dep_violations
+        self.current_fitness = delta.fitness
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from programmer import Programmer
+from solution import Solution
+
+
+def active_key(active_ids=None) -> int:
+    """Hash of the active task set, computed once per run and mixed into every genome key."""
+    if active_ids is None:
+        return 0
+    return hash(frozenset(active_ids))
+
+
+def genome_key(individual: Solution, active: int = 0) -> int:
+    """Cheap hash of the programmers' work plans plus the active task set."""
+    if individual.genome is not None:
+        return hash((individual.genome.plans.tobytes(), individual.genome.offsets.tobytes(), active))
+    return hash((tuple(tuple(p.work_plan) for p in individual.programmers), active))
+
+
+def plan_key(prog: Programmer, active: int = 0) -> int:
+    """Hash of everything a programmer's evaluation depends on, apart from the releases."""
+    return hash((tuple(prog.work_plan), prog.efficiency, active))
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry once maxsize entries are stored,
+    and counts hits and misses.
+    """
+    label = "Cache"
+
+    def __init__(self, maxsize: int = 10000):
+        if maxsize <= 0:
+            raise ValueError(f"{self.label} size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: int, entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"{self.label}: {self.hits} hits, {self.misses} misses "
+                f"({round(100 * self.hit_rate, 2)}% hit rate, {len(self)}/{self.maxsize} entries)")
+
+
+class FitnessCache(LRUCache):
+    """Fitness values keyed by genome_key."""
+    label = "Fitness cache"
+
+
+@dataclass
+class PlanEvaluation:
+    """
+    Result of Programmer.evaluate_work_plan, plus the minutes of work that fit in the releases.
+    The planned tasks are kept as arrays for the batch fitness, task_to_release is built from
+    them when first needed.
+    """
+    priority_per_release: List[int]
+    time_left: float
+    overflowing: bool
+    assigned_time: float
+    task_ids: np.ndarray
+    task_releases: np.ndarray
+    _task_to_release: Dict[int, int] = field(default=None, repr=False)
+
+    @property
+    def task_to_release(self) -> Dict[int, int]:
+        if self._task_to_release is None:
+            self._task_to_release = dict(zip(self.task_ids.tolist(), self.task_releases.tolist()))
+        return self._task_to_release
+
+
+class ProgrammerCache(LRUCache):
+    """
+    PlanEvaluation of single programmers keyed by plan_key and shared by every individual of a run,
+    so only programmers whose plan changed are simulated again.
+    One cache must only be used with a single list of releases.
+    """
+    label = "Programmer cache"
+
+    def evaluate(self, prog: Programmer, tasks, releases, active_ids=None, active: int = 0) -> PlanEvaluation:
+        key = plan_key(prog, active)
+        evaluation = self.get(key)
+        if evaluation is None:
+            priority_per_release, time_left, overflowing, task_to_release = prog.evaluate_work_plan(
+                tasks, releases, active_ids)
+            evaluation = PlanEvaluation(
+                priority_per_release=priority_per_release,
+                time_left=time_left,
+                overflowing=overflowing,
+                assigned_time=sum((tasks[i].cost / prog.efficiency) for i in task_to_release.keys()),
+                task_ids=np.fromiter(task_to_release.keys(), dtype=np.int32, count=len(task_to_release)),
+                task_releases=np.fromiter(task_to_release.values(), dtype=np.int16, count=len(task_to_release)),
+                _task_to_release=task_to_release,
+            )
+            self.put(key, evaluation)
+        return evaluation
@@ -4,38 +4,64 @@ from typing import List
 from release import Release
 from task import Task
 from solution import Solution
+from dependency_index import DependencyIndex
+from algorithms.fitness_cache import ProgrammerCache, active_key
 
 DEPENDENCY_PENALTY = 500
 OVERFLOW_PENALTY = 10000
 IMBALANCE_WEIGHT = 20  
 
-def fitness_function(individual: Solution, tasks: List[Task], releases: List[Release], debug: bool = False, active_ids=None) -> float:
+
+def count_dependency_violations(tasks: List[Task], task_to_release) -> int:
+    """
+    DependencyIndex.count_violations walking Task.dependencies, for callers without an index
+    (building one costs more than a whole evaluation).
+    """
+    dep_violations = 0
+    for t in tasks:
+        t_release = task_to_release.get(t.id, None)
+        if t_release is None:
+            continue
+        for child in t.dependencies:
+            child_release = task_to_release.get(child.id, None)
+            if child_release is None or child_release > t_release:
+                dep_violations += 1
+    return dep_violations
+
+
+def fitness_function(individual: Solution, tasks: List[Task], releases: List[Release], debug: bool = False, active_ids=None,
+                     dep_index: DependencyIndex = None, programmer_cache: ProgrammerCache = None) -> float:
     fitness = 0
     time_lefts = []
     assigned_times = []
     global_task_to_release = {}
+    active = active_key(active_ids) if programmer_cache is not None else 0
     for prog in individual.programmers:
-        priority_per_release, time_left, overflowing, task_to_release = prog.evaluate_work_plan(tasks, releases, active_ids)
+        if programmer_cache is not None:
+            # programmers whose plan did not change since it was last seen are not simulated again
+            evaluation = programmer_cache.evaluate(prog, tasks, releases, active_ids, active)
+            priority_per_release = evaluation.priority_per_release
+            time_left = evaluation.time_left
+            overflowing = evaluation.overflowing
+            task_to_release = evaluation.task_to_release
+            total_assigned = evaluation.assigned_time
+        else:
+            priority_per_release, time_left, overflowing, task_to_release = prog.evaluate_work_plan(tasks, releases, active_ids)
+            total_assigned = sum((tasks[i].cost / prog.efficiency) for i in task_to_release.keys())
         for task_id, i in task_to_release.items():
             global_task_to_release[task_id] = i
         if overflowing:
             fitness -= OVERFLOW_PENALTY
         time_lefts.append(time_left)
-        total_assigned = sum((tasks[i].cost / prog.efficiency) for i in task_to_release.keys())
         assigned_times.append(total_assigned)
         num_of_releases = len(priority_per_release)
         for i in range(num_of_releases):
             fitness += priority_per_release[i] * (2 ** (num_of_releases - i))
 
-    dep_violations = 0
-    for t in tasks:
-        t_release = global_task_to_release.get(t.id, None)
-        if t_release is None:
-            continue
-        for child in t.dependencies:
-            child_release = global_task_to_release.get(child.id, None)
-            if child_release is None or child_release > t_release:
-                dep_violations += 1
+    if dep_index is None:
+        dep_violations = count_dependency_violations(tasks, global_task_to_release)
+    else:
+        dep_violations = dep_index.count_violations(global_task_to_release)
     fitness -= dep_violations * DEPENDENCY_PENALTY
     
     stdev_assigned = stdev(assigned_times) 
@@ -1,10 +1,218 @@
 import random
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from release import Release
 from task import Task
 from solution import Solution
-from algorithms.fitness_function import fitness_function
+from genome import Genome
+from task_table import TaskTable
+from dependency_index import DependencyIndex
+from algorithms.batch_fitness import batch_fitness_function
+from algorithms.fitness_cache import FitnessCache, ProgrammerCache
+from algorithms.parallel import ParallelEvaluator
+from algorithms.stopping import StoppingCriteria
+from algorithms.telemetry import Callback, Telemetry
+
+
+def tournament_select(fitness: List[float], tournament_size: int) -> int:
+    selected = random.randrange(0, len(fitness))
+    for _ in range(tournament_size - 1):
+        candidate = random.randrange(0, len(fitness))
+        if fitness[candidate] > fitness[selected]:
+            selected = candidate
+    return selected
+
+
+CROSSOVER_TYPES = ("segment", "order")
+
+
+def position_index(individual: Solution) -> Dict[int, Tuple[int, int]]:
+    """Map every task id to its (programmer index, position) in the individual."""
+    return {task_id: (p, i) for p, prog in enumerate(individual.programmers) for i, task_id in enumerate(prog.work_plan)}
+
+
+def apply_swap(indiv, src_list, dst_list, index: Dict[int, Tuple[int, int]]):
+    """Replace every task of src_list by the task at the same place in dst_list, located through index."""
+    for src, dst in zip(src_list, dst_list):
+        p, i = index[src]
+        indiv.programmers[p].work_plan[i] = dst
+
+
+def _offspring(parent: Solution, buffer: Solution = None) -> Solution:
+    return parent.clone() if buffer is None else buffer.copy_from(parent)
+
+
+def crossover(parent1: Solution, parent2: Solution, crossover_rate: float,
+              index_cache: dict = None, into: Tuple[Solution, Solution] = None) -> Tuple[Solution, Solution]:
+    """
+    Swap a random segment between one programmer of each parent and repair the duplicates
+    it creates, in O(segment) once the position indexes of the parents are known.
+    index_cache keeps the position_index of parents between calls (keyed by id, so it must
+    not outlive the population). The children are written into the two solutions of into
+    when given, instead of new clones.
+    """
+    buffer1, buffer2 = into if into is not None else (None, None)
+    if random.random() > crossover_rate:
+        return _offspring(parent1, buffer1), _offspring(parent2, buffer2)
+
+    child1 = _offspring(parent1, buffer1)
+    child2 = _offspring(parent2, buffer2)
+    prog1 = random.choice(child1.programmers)
+    prog2 = random.choice(child2.programmers)
+    if len(prog1.work_plan) < 2 or len(prog2.work_plan) < 2:
+        return child1, child2
+
+    # choose random segment length and start, end indices
+    max_len = min(len(prog1.work_plan), len(prog2.work_plan))
+    seg_len = random.randint(1, max_len)
+    start1 = random.randint(0, len(prog1.work_plan) - seg_len)
+    start2 = random.randint(0, len(prog2.work_plan) - seg_len)
+    end1 = start1 + seg_len
+    end2 = start2 + seg_len
+    # get segments
+    segment1 = prog1.work_plan[start1:end1]
+    segment2 = prog2.work_plan[start2:end2]
+
+    # prepare swap mapping
+    in_segment1 = set(segment1)
+    in_segment2 = set(segment2)
+    swap1 = [task for task in segment1 if task not in in_segment2]
+    swap2 = [task for task in segment2 if task not in in_segment1]
+    # children are clones, so task positions are the parents' ones until the segments are swapped
+    if index_cache is None:
+        index_cache = {}
+    for parent in (parent1, parent2):
+        if id(parent) not in index_cache:
+            index_cache[id(parent)] = position_index(parent)
+    apply_swap(child1, swap2, swap1, index_cache[id(parent1)])
+    apply_swap(child2, swap1, swap2, index_cache[id(parent2)])
+
+    # finally, swap the segments
+    prog1.work_plan[start1:end1] = segment2
+    prog2.work_plan[start2:end2] = segment1
+    return child1, child2
+
+
+def order_crossover(parent1: Solution, parent2: Solution, crossover_rate: float,
+                    into: Tuple[Solution, Solution] = None) -> Tuple[Solution, Solution]:
+    """
+    Order crossover (OX) over the concatenated work plans of all programmers, so tasks can change
+    programmer. Each child keeps a random slice of one parent in place, takes the remaining tasks in
+    the order of the other parent and is cut into work plans of its first parent's lengths.
+    Both parents must contain the same tasks. The children are written into into, as in crossover.
+    """
+    buffer1, buffer2 = into if into is not None else (None, None)
+    if random.random() > crossover_rate:
+        return _offspring(parent1, buffer1), _offspring(parent2, buffer2)
+
+    flat1 = parent1.flatten()
+    flat2 = parent2.flatten()
+    if len(flat1) < 2:
+        return _offspring(parent1, buffer1), _offspring(parent2, buffer2)
+    start = random.randrange(len(flat1))
+    end = random.randint(start + 1, len(flat1))
+
+    def child(keep: Solution, keep_flat: List[int], other_flat: List[int], buffer: Solution) -> Solution:
+        kept = set(keep_flat[start:end])
+        rest = [task for task in other_flat if task not in kept]
+        flat = rest[:start] + keep_flat[start:end] + rest[start:]
+        offspring = keep.clone() if buffer is None else buffer
+        offset = 0
+        for prog, source in zip(offspring.programmers, keep.programmers):
+            prog.work_plan[:] = flat[offset:offset + len(source.work_plan)]
+            offset += len(source.work_plan)
+        return offspring
+
+    return child(parent1, flat1, flat2, buffer1), child(parent2, flat2, flat1, buffer2)
+
+
+def mutate(individual: Solution, mutation_rate: float) -> Solution:
+    if random.random() > mutation_rate:
+        return individual
+    # backup = individual.clone()
+    if random.random() > 0.5:
+        # swap two tasks in a programmer's work plan
+        prog = random.choice(individual.programmers)
+        idx1 = random.randrange(len(prog.work_plan))
+        idx2 = random.randrange(len(prog.work_plan))
+        prog.work_plan[idx1], prog.work_plan[idx2] = prog.work_plan[idx2], prog.work_plan[idx1]
+    else:
+        # move a task from one programmer to another
+        prog1, prog2 = random.sample(individual.programmers, 2)
+        task1 = prog1.work_plan.pop(random.randrange(len(prog1.work_plan)))
+        prog2.work_plan.insert(random.randrange(len(prog2.work_plan)), task1)
+    return individual
+
+
+def next_generation(
+        population: List[Solution],
+        fitness: List[float],
+        population_size: int,
+        crossover_rate: float,
+        mutation_rate: float,
+        tournament_size: int,
+        crossover_type: str = "segment",
+) -> List[Solution]:
+    """One round of tournament selection, crossover and mutation."""
+    new_population = []
+    index_cache = {}
+    while len(new_population) < population_size:
+        parent1 = tournament_select(fitness, tournament_size)
+        parent2 = tournament_select(fitness, tournament_size)
+        match crossover_type:
+            case "segment":
+                child1, child2 = crossover(population[parent1], population[parent2], crossover_rate, index_cache)
+            case "order":
+                child1, child2 = order_crossover(population[parent1], population[parent2], crossover_rate)
+            case _:
+                raise ValueError(f"Unknown crossover type: {crossover_type}")
+        child1 = mutate(child1, mutation_rate)
+        child2 = mutate(child2, mutation_rate)
+        new_population.append(child1)
+        new_population.append(child2)
+    return new_population
+
+
+def steady_state_step(
+        population: List[Solution],
+        fitness: List[float],
+        offspring: List[Solution],
+        evaluate,
+        crossover_rate: float,
+        mutation_rate: float,
+        tournament_size: int,
+        crossover_type: str = "segment",
+) -> List[float]:
+    """
+    One steady-state step: breed len(offspring) children into the offspring buffers, score only
+    them with evaluate, and let each child replace one of the worst individuals if it is fitter.
+    Elites stay in place and nothing is cloned: a replaced individual becomes an offspring buffer
+    for the next step. population, fitness and offspring are updated in place.
+    Returns the fitness of the children.
+    """
+    index_cache = {}
+    for k in range(0, len(offspring), 2):
+        parent1 = population[tournament_select(fitness, tournament_size)]
+        parent2 = population[tournament_select(fitness, tournament_size)]
+        into = offspring[k], offspring[k + 1]
+        match crossover_type:
+            case "segment":
+                crossover(parent1, parent2, crossover_rate, index_cache, into)
+            case "order":
+                order_crossover(parent1, parent2, crossover_rate, into)
+            case _:
+                raise ValueError(f"Unknown crossover type: {crossover_type}")
+        mutate(offspring[k], mutation_rate)
+        mutate(offspring[k + 1], mutation_rate)
+
+    children_fitness = list(evaluate(offspring))
+    worst = sorted(range(len(population)), key=lambda i: fitness[i])[:len(offspring)]
+    children = sorted(range(len(offspring)), key=lambda k: children_fitness[k], reverse=True)
+    for i, k in zip(worst, children):
+        if children_fitness[k] > fitness[i]:
+            population[i], offspring[k] = offspring[k], population[i]
+            fitness[i] = children_fitness[k]
+    return children_fitness
 
 
 def genetic(
@@ -17,112 +225,94 @@ def genetic(
         crossover_rate: float = 0.6,
         mutation_rate: float = 0.5,
         tournament_size: int = 15,
+        dep_index: DependencyIndex = None,
+        fitness_cache_size: int = 0,
+        programmer_cache_size: int = 0,
+        workers: int = 1,
+        crossover_type: str = "segment",
+        stopping: StoppingCriteria = None,
+        steady_state: int = 0,
+        compact: bool = False,
+        callbacks: List[Callback] = None,
 ) -> Solution:
-    def select() -> int:
-        selected = random.randrange(0, len(population))
-        for _ in range(tournament_size - 1):
-            candidate = random.randrange(0, len(population))
-            if fitness[candidate] > fitness[selected]:
-                selected = candidate
-        return selected
-
-    def apply_swap(indiv, src_list, dst_list):
-        for prog in indiv.programmers:
-            for i in range(len(prog.work_plan)):
-                for j in range(len(src_list)):
-                    if prog.work_plan[i] == src_list[j]:
-                        prog.work_plan[i] = dst_list[j]
-
-    def crossover(p1: int, p2: int) -> Tuple[Solution, Solution]:
-        if random.random() > crossover_rate:
-            return population[p1].clone(), population[p2].clone()
-
-        child1 = population[p1].clone()
-        child2 = population[p2].clone()
-        prog1 = random.choice(child1.programmers)
-        prog2 = random.choice(child2.programmers)
-        if len(prog1.work_plan) < 2 or len(prog2.work_plan) < 2:
-            return child1, child2
-
-        # choose random segment length and start, end indices
-        max_len = min(len(prog1.work_plan), len(prog2.work_plan))
-        seg_len = random.randint(1, max_len)
-        start1 = random.randint(0, len(prog1.work_plan) - seg_len)
-        start2 = random.randint(0, len(prog2.work_plan) - seg_len)
-        end1 = start1 + seg_len
-        end2 = start2 + seg_len
-        # get segments
-        segment1 = prog1.work_plan[start1:end1]
-        segment2 = prog2.work_plan[start2:end2]
-
-        # prepare swap mapping
-        swap1 = []
-        swap2 = segment2.copy()
-        for task in segment1:
-            if task not in swap2:
-                swap1.append(task)
-            else:
-                swap2.remove(task)
-        apply_swap(child1, swap2, swap1)
-        apply_swap(child2, swap1, swap2)
-
-        # finally, swap the segments
-        prog1.work_plan[start1:end1] = segment2
-        prog2.work_plan[start2:end2] = segment1
-        return child1, child2
-
-    def mutate(individual: Solution) -> Solution:
-        if random.random() > mutation_rate:
-            return individual
-        # backup = individual.clone()
-        if random.random() > 0.5:
-            # swap two tasks in a programmer's work plan
-            prog = random.choice(individual.programmers)
-            idx1 = random.randrange(len(prog.work_plan))
-            idx2 = random.randrange(len(prog.work_plan))
-            prog.work_plan[idx1], prog.work_plan[idx2] = prog.work_plan[idx2], prog.work_plan[idx1]
-        else:
-            # move a task from one programmer to another
-            prog1, prog2 = random.sample(individual.programmers, 2)
-            task1 = prog1.work_plan.pop(random.randrange(len(prog1.work_plan)))
-            prog2.work_plan.insert(random.randrange(len(prog2.work_plan)), task1)
-        return individual
+    """
+    Evolves population_size plans for generations generations and returns the best plan found.
+    With stopping, the search ends earlier once one of its criteria is met.
+    With steady_state > 0, a generation is made of steady_state_step()s that breed steady_state
+    children (rounded up to even) into reused buffers and replace the worst individuals, until
+    population_size children were bred; only the children are scored.
+    With compact, individuals are stored as Genomes (one int array each) behind the Solution API.
+    The GenerationStats of every generation go to callbacks (printed every 10 generations when
+    None, nowhere when empty).
+    """
+    if crossover_type not in CROSSOVER_TYPES:
+        raise ValueError(f"Unknown crossover type: {crossover_type}")
+    if not 0 <= steady_state < population_size:
+        raise ValueError(f"steady_state must be between 0 and the population size, got {steady_state}")
 
     # Initialize
+    if stopping is not None:
+        stopping.start()
+    telemetry = Telemetry("genetic", callbacks)
+    table = TaskTable.from_tasks(tasks, dep_index)
+    cache = FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None
+    programmer_cache = ProgrammerCache(programmer_cache_size) if programmer_cache_size > 0 else None
+    executor = ParallelEvaluator(table, releases, workers) if workers > 1 else None
     population = []
-    fitness = []
     best_fitness = float('-inf')
     best = None
 
     for _ in range(population_size):
         individual = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
-        population.append(individual)
-        fit = fitness_function(individual, tasks, releases)
-        fitness.append(fit)
-        if fit > best_fitness:
-            best_fitness = fit
-            best = individual
+        population.append(Genome.from_solution(individual).as_solution() if compact else individual)
+    fitness = batch_fitness_function(population, tasks, releases, table=table, cache=cache,
+                                     programmer_cache=programmer_cache, executor=executor).tolist()
+    for i in range(population_size):
+        if fitness[i] > best_fitness:
+            best_fitness = fitness[i]
+            best = population[i]
+    best = best.clone()
+    offspring = [best.clone() for _ in range(steady_state + steady_state % 2)]
+    steps = -(-population_size // len(offspring)) if offspring else 0
+    evaluations = steps * len(offspring) if offspring else population_size
+
+    def evaluate(individuals: List[Solution]):
+        return batch_fitness_function(individuals, tasks, releases, table=table, cache=cache,
+                                      programmer_cache=programmer_cache, executor=executor).tolist()
+
+    telemetry.count(population_size)
+    stop = stopping is not None and stopping.update(best_fitness, population_size)
 
     # Evolve population
     for gen in range(generations):
-        new_population = []
-        while len(new_population) < population_size:
-            parent1 = select()
-            parent2 = select()
-            child1, child2 = crossover(parent1, parent2)
-            child1 = mutate(child1)
-            child2 = mutate(child2)
-            new_population.append(child1)
-            new_population.append(child2)
-        population = new_population
-
-        for i in range(population_size):
-            fitness[i] = fitness_function(population[i], tasks, releases)
-            if fitness[i] > best_fitness:
-                best_fitness = fitness[i]
-                best = population[i].clone()
-
-        if  gen % 10 == 0:
-            print(f"Generation: {gen}, best fitness: {round(best_fitness, 2)}")
+        if stop:
+            telemetry.note(f"Stopped before generation {gen}: {stopping.reason}")
+            break
+        if not offspring:
+            population = next_generation(population, fitness, population_size, crossover_rate, mutation_rate,
+                                         tournament_size, crossover_type)
+            fitness = evaluate(population)
+            for i in range(population_size):
+                if fitness[i] > best_fitness:
+                    best_fitness = fitness[i]
+                    best = population[i].clone()
+        else:
+            # individuals are overwritten by later steps, so the best is looked for after each one
+            for _ in range(steps):
+                steady_state_step(population, fitness, offspring, evaluate, crossover_rate, mutation_rate,
+                                  tournament_size, crossover_type)
+                for i in range(population_size):
+                    if fitness[i] > best_fitness:
+                        best_fitness = fitness[i]
+                        best = population[i].clone()
+
+        telemetry.report(gen, evaluations, best_fitness, fitness, population, cache, programmer_cache)
+        stop = stopping is not None and stopping.update(best_fitness, evaluations)
 
+    if executor is not None:
+        executor.close()
+    if cache is not None:
+        print(cache.report())
+    if programmer_cache is not None:
+        print(programmer_cache.report())
     return best
@@ -1,62 +1,102 @@
+import heapq
+from bisect import bisect_left, insort
 from typing import Tuple, List
 
 from release import Release
 from solution import Solution
 from programmer import PROGRAMMING_HOURS_IN_WORK_DAY
 from task import Task
+from dependency_index import DependencyIndex
 
+FIT_STRATEGIES = ("worst", "best")
 
-def fix_dependencies(tasks: List[Task]) -> List[Task]:
+
+def _waiting_dependencies(tasks: List[Task], dep_index: DependencyIndex) -> Tuple[List[int], List[int]]:
     """
-    Reorder tasks so that each task appears after its dependencies,
-    using repeated swaps until stable.
+    Position of every task id in tasks (-1 for tasks not in the list) and, for every task of
+    tasks, the number of its dependencies that are in the list.
     """
-    max_iterations = len(tasks) * len(tasks)
-    for _ in range(max_iterations):
-        changed = False
-        task_index = {task.id: i for i, task in enumerate(tasks)}
-        for i, task in enumerate(tasks):
-            for dep in task.dependencies:
-                dep_id = dep.id
-                if dep_id not in task_index:
-                    continue
-                dep_index = task_index[dep_id]
+    dep_ptr, dep_ids, _, _ = dep_index.lists
+    task_index = [-1] * dep_index.num_tasks
+    for i, task in enumerate(tasks):
+        task_index[task.id] = i
+    waiting = [0] * len(tasks)
+    for i, task in enumerate(tasks):
+        waiting[i] = sum(1 for k in range(dep_ptr[task.id], dep_ptr[task.id + 1]) if task_index[dep_ids[k]] >= 0)
+    return task_index, waiting
 
-                if dep_index > i:
-                    tasks[i], tasks[dep_index] = tasks[dep_index], tasks[i]
-                    changed = True
-                    break
-            if changed:
-                break
-        if not changed:
-            break
 
+def fix_dependencies(tasks: List[Task], dep_index: DependencyIndex = None) -> List[Task]:
+    """
+    Reorder tasks in place so that each task appears after its dependencies (Kahn's algorithm).
+    Among the tasks whose dependencies are all placed, the next one is the smallest
+    (priority, cost), ties keeping the order of tasks. Dependencies on tasks not in the list
+    are ignored, and tasks on a dependency cycle are placed last in that same order.
+    """
+    if dep_index is None:
+        dep_index = DependencyIndex.from_tasks(tasks)
+    task_index, waiting = _waiting_dependencies(tasks, dep_index)
+    _, _, rev_ptr, rev_ids = dep_index.lists
+    ready = [(task.priority, task.cost, i) for i, task in enumerate(tasks) if waiting[i] == 0]
+    heapq.heapify(ready)
+
+    order = []
+    while ready:
+        _, _, i = heapq.heappop(ready)
+        order.append(tasks[i])
+        task_id = tasks[i].id
+        for k in range(rev_ptr[task_id], rev_ptr[task_id + 1]):
+            j = task_index[rev_ids[k]]
+            if j >= 0:
+                waiting[j] -= 1
+                if waiting[j] == 0:
+                    heapq.heappush(ready, (tasks[j].priority, tasks[j].cost, j))
+
+    if len(order) < len(tasks):
+        order += sorted((task for i, task in enumerate(tasks) if waiting[i] > 0), key=lambda t: (t.priority, t.cost))
+    tasks[:] = order
     return tasks
 
 
 def greedy(
         tasks: List[Task],
         programmers_specs: List[Tuple[str, float]],
-        releases: List[Release]
+        releases: List[Release],
+        dep_index: DependencyIndex = None,
 ) -> Solution:
+    """
+    Plans tasks by increasing (priority, cost) in dependency order, each one on the programmer
+    who can finish it first (the first such programmer on ties). Tasks that no programmer can
+    finish by the end of the last release are dropped.
+    """
     solution = Solution().initialize(programmers_specs, [], "empty")
     programmer_hours = [0.0] * len(programmers_specs)
     total_capacity_minutes = sum(r.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60 for r in releases)
 
     sorted_tasks = sorted(tasks, key=lambda t: (t.priority, t.cost))
-    sorted_tasks = fix_dependencies(sorted_tasks)
+    sorted_tasks = fix_dependencies(sorted_tasks, dep_index)
+
+    # Programmers of the same efficiency finish a task in the order of their planned hours,
+    # so only the top of one (hours, programmer id) heap per efficiency is a candidate
+    groups = {}
+    for i, prog in enumerate(solution.programmers):
+        groups.setdefault(prog.efficiency, []).append((0.0, i))
+    heaps = list(groups.items())
 
     for task in sorted_tasks:
+        best_heap = None
         best_programmer_id = -1
         earliest_finish_time = float('inf')
 
         # Find programmer who can finish task quickest
-        for i, prog in enumerate(solution.programmers):
-            task_done_at = programmer_hours[i] + task.cost / prog.efficiency
+        for efficiency, heap in heaps:
+            hours, i = heap[0]
+            task_done_at = hours + task.cost / efficiency
 
-            if task_done_at < earliest_finish_time:
+            if task_done_at < earliest_finish_time or (task_done_at == earliest_finish_time and i < best_programmer_id):
                 earliest_finish_time = task_done_at
                 best_programmer_id = i
+                best_heap = heap
 
         # check if task is done by last planned release, else drop task
         if earliest_finish_time <= total_capacity_minutes:
@@ -64,5 +104,129 @@ def greedy(
 
             chosen_prog.add_task(task.id)
             programmer_hours[best_programmer_id] += (task.cost / chosen_prog.efficiency)
+            heapq.heapreplace(best_heap, (programmer_hours[best_programmer_id], best_programmer_id))
+
+    return solution
+
+
+def _landing(time_left: float, release: int, duration: float, capacities: List[int], last: int):
+    """
+    Release in which Programmer.evaluate_work_plan puts a task of duration after a plan that
+    reached release with time_left left, and the time left there before the task, with the
+    same float operations. None when the task does not fit by release last.
+    """
+    while time_left - duration < 0:
+        if release == last:
+            return None
+        release += 1
+        time_left += capacities[release]
+    return release, time_left
+
+
+def release_greedy(
+        tasks: List[Task],
+        programmers_specs: List[Tuple[str, float]],
+        releases: List[Release],
+        dep_index: DependencyIndex = None,
+        fit: str = "worst",
+) -> Solution:
+    """
+    Packs the release windows one after the other. A task is ready once all its dependencies
+    are planned, and ready tasks are taken by increasing (priority, cost). Each goes to a
+    programmer with enough time left in the window: the one with the most time left
+    (fit="worst", which keeps assigned time balanced) or the one left with the least time
+    after it (fit="best"). Time left carries over between releases as in
+    Programmer.evaluate_work_plan, so a task may land in a release before the window it was
+    packed in. A task only goes to a programmer whose plan puts it in the release of its
+    latest dependency or later, so dependencies always are in the same or an earlier release.
+    Tasks that fit nowhere wait for the next release, and those not packed by the last
+    release are dropped.
+    """
+    if fit not in FIT_STRATEGIES:
+        raise ValueError(f"Unknown fit strategy: {fit}")
+    solution = Solution().initialize(programmers_specs, [], "empty")
+    if not releases:
+        return solution
+    if dep_index is None:
+        dep_index = DependencyIndex.from_tasks(tasks)
+    task_index, waiting = _waiting_dependencies(tasks, dep_index)
+    dep_ptr, dep_ids, rev_ptr, rev_ids = dep_index.lists
+    capacities = [release.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60 for release in releases]
+    deferred = [(task.priority, task.cost, i) for i, task in enumerate(tasks) if waiting[i] == 0]
+    landed = [-1] * len(tasks)  # release every planned task lands in
+
+    # Programmer.evaluate_work_plan state of every plan: the release it reached and the time left in it
+    plan_release = [0] * len(programmers_specs)
+    plan_time_left = [float(capacities[0])] * len(programmers_specs)
+    # time left of every plan by the end of the current window
+    time_left = [0.0] * len(programmers_specs)
+    for r, capacity in enumerate(capacities):
+        for p in range(len(time_left)):
+            time_left[p] = plan_time_left[p] if r == 0 else time_left[p] + capacity
+        # sorted (time left, programmer id) of every efficiency group
+        groups = {}
+        for p, prog in enumerate(solution.programmers):
+            groups.setdefault(prog.efficiency, []).append((time_left[p], p))
+        for free in groups.values():
+            free.sort()
+
+        ready = deferred
+        heapq.heapify(ready)
+        deferred = []
+        while ready:
+            entry = heapq.heappop(ready)
+            i = entry[2]
+            task = tasks[i]
+            first_release = None  # latest release of a dependency, looked up once a programmer has time
+            best = None
+            smallest_rest = float('inf')  # time left after the task for best fit, minus time left before for worst fit
+            for efficiency, free in groups.items():
+                duration = task.cost / efficiency
+                if free[-1][0] - duration < 0:
+                    continue
+                if first_release is None:
+                    first_release = 0
+                    for k in range(dep_ptr[task.id], dep_ptr[task.id + 1]):
+                        if task_index[dep_ids[k]] >= 0:
+                            first_release = max(first_release, landed[task_index[dep_ids[k]]])
+                # candidates from the preferred one on, skipping plans that would put the task
+                # before one of its dependencies
+                pos, step = (bisect_left(free, (duration, -1)), 1) if fit == "best" else (len(free) - 1, -1)
+                while 0 <= pos < len(free):
+                    left, p = free[pos]
+                    if left - duration < 0:
+                        break
+                    if first_release > 0:
+                        landing = _landing(plan_time_left[p], plan_release[p], duration, capacities, r)
+                        if landing is None or landing[0] < first_release:
+                            pos += step
+                            continue
+                    rest = left - duration if fit == "best" else -left
+                    if rest < smallest_rest or (rest == smallest_rest and p < best[2]):
+                        smallest_rest = rest
+                        best = (free, pos, p, duration)
+                    break
+            if best is None:
+                deferred.append(entry)
+                continue
+
+            free, pos, p, duration = best
+            release, left = _landing(plan_time_left[p], plan_release[p], duration, capacities, r)
+            solution.programmers[p].add_task(task.id)
+            landed[i] = release
+            plan_release[p] = release
+            plan_time_left[p] = left - duration
+            left = plan_time_left[p]
+            for later in range(release + 1, r + 1):
+                left += capacities[later]
+            time_left[p] = left
+            del free[pos]
+            insort(free, (left, p))
+            for k in range(rev_ptr[task.id], rev_ptr[task.id + 1]):
+                j = task_index[rev_ids[k]]
+                if j >= 0:
+                    waiting[j] -= 1
+                    if waiting[j] == 0:
+                        heapq.heappush(ready, (tasks[j].priority, tasks[j].cost, j))
 
     return solution
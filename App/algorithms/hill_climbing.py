@@ -1,10 +1,15 @@
-import random
 from typing import List, Tuple
 
 from release import Release
 from task import Task
 from solution import Solution
-from algorithms.fitness_function import fitness_function
+from dependency_index import DependencyIndex
+from task_table import TaskTable
+from algorithms.delta_fitness import DeltaEvaluator
+from algorithms.moves import random_block_neighbor, random_move_neighbor, random_swap_neighbor
+from algorithms.parallel import ParallelNeighbourhood
+from algorithms.stopping import StoppingCriteria
+from algorithms.telemetry import Callback, Telemetry
 
 
 def hill_climbing(
@@ -15,74 +20,81 @@ def hill_climbing(
         max_iterations: int = 200,
         swap_tries: int = 50,
         move_tries: int = 50,
+        block_tries: int = 0,
+        dep_index: DependencyIndex = None,
+        workers: int = 1,
+        stopping: StoppingCriteria = None,
+        initial_solution: Solution = None,
+        callbacks: List[Callback] = None,
 ) -> Solution:
-    def random_swap_neighbor(individual: Solution) -> Solution:
-        neighbour = individual.clone()
-        candidates = [p for p in neighbour.programmers if len(p.work_plan) >= 2]
-        if not candidates:
-            return neighbour
-        prog = random.choice(candidates)
-        idx1 = random.randrange(len(prog.work_plan))
-        idx2 = random.randrange(len(prog.work_plan))
-        prog.work_plan[idx1], prog.work_plan[idx2] = prog.work_plan[idx2], prog.work_plan[idx1]
-        return neighbour
-
-    def random_move_neighbor(individual: Solution) -> Solution:
-        neighbour = individual.clone()
-        src_candidates = [p for p in neighbour.programmers if len(p.work_plan) >= 1]
-        if len(src_candidates) < 1 or len(neighbour.programmers) < 2:
-            return neighbour
-
-        prog1 = random.choice(src_candidates)
-        prog2 = random.choice([p for p in neighbour.programmers if p is not prog1])
-
-        task_idx = random.randrange(len(prog1.work_plan))
-        task_id = prog1.work_plan.pop(task_idx)
-        insert_idx = random.randrange(len(prog2.work_plan) + 1)
-        prog2.work_plan.insert(insert_idx, task_id)
-        return neighbour
-
+    """
+    Steepest-ascent hill climbing over random swap, move and (with block_tries) block-move
+    neighbours, until a local optimum or max_iterations. It starts from a copy of initial_solution when given, from a solution
+    built with init_strategy otherwise. With stopping, the search ends earlier once one of its
+    criteria is met. Neighbours are Move objects scored in place, only the accepted one is applied.
+    The GenerationStats of every improving iteration go to callbacks (printed every 10 iterations
+    when None, nowhere when empty).
+    """
     # Initialization
-    current = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
-    current_fitness = fitness_function(current, tasks, releases)
-    best = current.clone()
-    best_fitness = current_fitness
-
-    print("HC initial fitness:", round(best_fitness, 2))
-
-    # Hill climbing
-    for it in range(max_iterations):
-        best_neighbor = None
-        best_neighbor_fitness = current_fitness
-
-        # Try swaping tasks inside programmers work plans
-        for _ in range(swap_tries):
-            neighbour = random_swap_neighbor(current)
-            fit = fitness_function(neighbour, tasks, releases)
-            if fit > best_neighbor_fitness:
-                best_neighbor_fitness = fit
-                best_neighbor = neighbour
-
-        # Try moving tasks between programmers
-        for _ in range(move_tries):
-            neighbour = random_move_neighbor(current)
-            fit = fitness_function(neighbour, tasks, releases)
-            if fit > best_neighbor_fitness:
-                best_neighbor_fitness = fit
-                best_neighbor = neighbour
-
-        if best_neighbor is not None and best_neighbor_fitness > current_fitness:
-            current = best_neighbor
-            current_fitness = best_neighbor_fitness
+    if stopping is not None:
+        stopping.start()
+    telemetry = Telemetry("hill_climbing", callbacks)
+    if initial_solution is not None:
+        current = initial_solution.clone()
+    else:
+        current = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
+    table = TaskTable.from_tasks(tasks, dep_index)
+    evaluator = DeltaEvaluator(current, tasks, releases, table=table)
+    neighbourhood = ParallelNeighbourhood(current, table, releases, workers) if workers > 1 else None
+    current_fitness = evaluator.fitness()
+    telemetry.count(1)
 
-            if current_fitness > best_fitness:
-                best = current.clone()
-                best_fitness = current_fitness
+    telemetry.note(f"HC initial fitness: {round(current_fitness, 2)}")
+    stop = stopping is not None and stopping.update(current_fitness, 1)
 
-            if  it % 10 == 0:
-                print(f"Iteration: {it}, fitness: {round(best_fitness, 2)}")
-        else:
-            print(f"HC stopped at iter {it}: local optimum fitness = {round(current_fitness, 2)}")
-            break
+    try:
+        # Hill climbing, neighbours are scored without copying the current solution.
+        # Only improving moves are applied, so current is always the best solution found.
+        for it in range(max_iterations):
+            if stop:
+                telemetry.note(f"HC stopped at iter {it}: {stopping.reason}, fitness = {round(current_fitness, 2)}")
+                break
+            # Try swaping tasks inside programmers work plans, then moving tasks (and blocks of tasks) between programmers
+            neighbours = [random_swap_neighbor(current) for _ in range(swap_tries)]
+            neighbours += [random_move_neighbor(current) for _ in range(move_tries)]
+            neighbours += [random_block_neighbor(current) for _ in range(block_tries)]
+            neighbours = [move for move in neighbours if move is not None]
+            best_neighbor = None
+            best_delta = None
+            best_neighbor_fitness = current_fitness
+            if neighbourhood is not None:
+                scores = neighbourhood.score(neighbours)
+                for move, fit in zip(neighbours, scores):
+                    if fit > best_neighbor_fitness:
+                        best_neighbor_fitness = fit
+                        best_neighbor = move
+            else:
+                scores = []
+                for move in neighbours:
+                    delta = evaluator.evaluate(move)
+                    scores.append(delta.fitness)
+                    if delta.fitness > best_neighbor_fitness:
+                        best_neighbor_fitness = delta.fitness
+                        best_neighbor = move
+                        best_delta = delta
 
-    return best
+            if best_neighbor is not None and best_neighbor_fitness > current_fitness:
+                # the workers only send back fitness values, so only then is the chosen move scored again
+                evaluator.commit(best_delta if best_delta is not None else evaluator.evaluate(best_neighbor))
+                if neighbourhood is not None:
+                    neighbourhood.commit(best_neighbor)
+                current_fitness = best_neighbor_fitness
+                telemetry.report(it, len(neighbours), current_fitness, scores)
+            else:
+                telemetry.note(f"HC stopped at iter {it}: local optimum fitness = {round(current_fitness, 2)}")
+                break
+            stop = stopping is not None and stopping.update(current_fitness, len(neighbours))
+    finally:
+        if neighbourhood is not None:
+            neighbourhood.close()
+    return current
@@ -0,0 +1,163 @@
+import multiprocessing
+import random
+from typing import List, Tuple
+
+from release import Release
+from task import Task
+from solution import Solution
+from task_table import TaskTable
+from dependency_index import DependencyIndex
+from algorithms.batch_fitness import _evaluate
+from algorithms.genetic import CROSSOVER_TYPES, next_generation
+from algorithms.parallel import attach_table, decode, encode, publish_table, stop_workers
+from algorithms.telemetry import Callback, Telemetry, population_diversity
+
+TOPOLOGIES = ("ring", "fully_connected", "random")
+
+
+def _island(conn, seed: int, tasks: List[Task], programmers_specs: List[Tuple[str, float]],
+            releases: List[Release], spec: dict, init_strategy: str, population_size: int,
+            crossover_rate: float, mutation_rate: float, tournament_size: int, crossover_type: str,
+            migrants: int) -> None:
+    """One island: the genetic() loop on its own population, run in its own process."""
+    random.seed(seed)
+    table, blocks = attach_table(spec)
+    population = [Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
+                  for _ in range(population_size)]
+    fitness = _evaluate(population, releases, None, table).tolist()
+    best = max(range(len(population)), key=lambda i: fitness[i])
+    best_genome, best_fitness = encode(population[best]), fitness[best]
+
+    while True:
+        command, payload = conn.recv()
+        if command != "evolve":
+            break
+        generations, immigrants, want_stats = payload
+
+        # immigrants replace the worst individuals
+        if immigrants:
+            worst = sorted(range(len(population)), key=lambda i: fitness[i])[:len(immigrants)]
+            for i, (genome, fit) in zip(worst, immigrants):
+                population[i] = decode(genome)
+                fitness[i] = fit
+
+        for _ in range(generations):
+            population = next_generation(population, fitness, population_size, crossover_rate, mutation_rate,
+                                         tournament_size, crossover_type)
+            fitness = _evaluate(population, releases, None, table).tolist()
+            best = max(range(len(population)), key=lambda i: fitness[i])
+            if fitness[best] > best_fitness:
+                best_genome, best_fitness = encode(population[best]), fitness[best]
+
+        ranking = sorted(range(len(population)), key=lambda i: fitness[i], reverse=True)[:migrants]
+        stats = (fitness, population_diversity(population)) if want_stats else None
+        conn.send(((best_genome, best_fitness), [(encode(population[i]), fitness[i]) for i in ranking], stats))
+
+    for block in blocks:
+        block.close()
+
+
+def _migration_targets(topology: str, island: int, islands: int) -> List[int]:
+    others = [i for i in range(islands) if i != island]
+    match topology:
+        case "ring":
+            return [(island + 1) % islands]
+        case "fully_connected":
+            return others
+        case "random":
+            return [random.choice(others)]
+        case _:
+            raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def island_genetic(
+        tasks: List[Task],
+        programmers_specs: List[Tuple[str, float]],
+        releases: List[Release],
+        init_strategy="random",
+        islands: int = 4,
+        population_size: int = 250,
+        generations: int = 100,
+        crossover_rate: float = 0.6,
+        mutation_rate: float = 0.5,
+        tournament_size: int = 15,
+        crossover_type: str = "segment",
+        migration_interval: int = 10,
+        migrants: int = 2,
+        topology: str = "ring",
+        dep_index: DependencyIndex = None,
+        callbacks: List[Callback] = None,
+) -> Solution:
+    """
+    Island model of genetic(): islands independent populations of population_size, each evolved
+    in its own process. Every migration_interval generations each island sends its migrants best
+    individuals along the topology ("ring", "fully_connected" or "random"), where they replace
+    the worst individuals of the receiving island. The GenerationStats of the islands together
+    go to callbacks after every migration (printed when None, nowhere when empty); the islands
+    only send their fitness values and diversity when a callback takes them.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {topology}")
+    if crossover_type not in CROSSOVER_TYPES:
+        raise ValueError(f"Unknown crossover type: {crossover_type}")
+    if islands < 2:
+        raise ValueError("The island model needs at least 2 islands")
+
+    telemetry = Telemetry("island_GA", callbacks, print_interval=1)
+    table = TaskTable.from_tasks(tasks, dep_index)
+    blocks, spec = publish_table(table)
+    connections = []
+    processes = []
+    for _ in range(islands):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_island,
+            args=(child_conn, random.randrange(2 ** 32), tasks, programmers_specs, releases, spec, init_strategy,
+                  population_size, crossover_rate, mutation_rate, tournament_size, crossover_type, migrants),
+            daemon=True,
+        )
+        process.start()
+        # only the island holds its end, so recv() raises EOFError when it dies
+        child_conn.close()
+        connections.append(parent_conn)
+        processes.append(process)
+
+    best = None
+    best_fitness = float('-inf')
+    immigrants = [[] for _ in range(islands)]
+    telemetry.count(islands * population_size)
+    try:
+        gen = 0
+        while gen < generations:
+            epoch = min(migration_interval, generations - gen)
+            want_stats = telemetry.wants(gen + epoch)
+            for conn, arriving in zip(connections, immigrants):
+                conn.send(("evolve", (epoch, arriving, want_stats)))
+            results = [conn.recv() for conn in connections]
+            gen += epoch
+
+            immigrants = [[] for _ in range(islands)]
+            for island, ((island_best, island_best_fitness), sent, _) in enumerate(results):
+                if island_best_fitness > best_fitness:
+                    best_fitness = island_best_fitness
+                    best = decode(island_best)
+                for target in _migration_targets(topology, island, islands):
+                    immigrants[target].extend(sent)
+            for arriving in immigrants:
+                arriving.sort(key=lambda migrant: migrant[1], reverse=True)
+                del arriving[migrants:]
+
+            fitness, diversity = [], None
+            if want_stats:
+                fitness = [fit for _, _, (island_fitness, _) in results for fit in island_fitness]
+                diversity = sum(island_diversity for _, _, (_, island_diversity) in results) / islands
+            telemetry.report(gen, islands * epoch * population_size, best_fitness, fitness, diversity=diversity)
+    finally:
+        try:
+            stop_workers(connections, processes)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    return best
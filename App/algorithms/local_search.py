@@ -0,0 +1,197 @@
+import math
+import random
+from typing import List, Tuple
+
+from release import Release
+from task import Task
+from solution import Solution
+from dependency_index import DependencyIndex
+from task_table import TaskTable
+from algorithms.delta_fitness import Delta, DeltaEvaluator
+from algorithms.moves import Move, random_move_neighbor, random_swap_neighbor
+from algorithms.stopping import StoppingCriteria
+from algorithms.telemetry import Callback, Telemetry
+
+
+def random_neighbor(solution: Solution) -> Move:
+    """A swap or a move neighbour with equal probability, None when the solution has neither."""
+    if random.random() < 0.5:
+        return random_swap_neighbor(solution) or random_move_neighbor(solution)
+    return random_move_neighbor(solution) or random_swap_neighbor(solution)
+
+
+class _BestTracker:
+    """
+    Best solution seen by a local search that changes current in place. It keeps the moves
+    committed since the last state at least as good as every state before, and best() undoes
+    them on a copy of current. current is only copied during the search when that trail grows
+    past max_trail moves.
+    """
+
+    def __init__(self, current: Solution, fitness: float, max_trail: int = 1000):
+        self.current = current
+        self.fitness = fitness
+        self.max_trail = max_trail
+        self.trail = []
+        self.snapshot = None
+
+    def commit(self, evaluator: DeltaEvaluator, move: Move, delta: Delta) -> None:
+        evaluator.commit(delta)
+        if delta.fitness >= self.fitness:
+            self.fitness = delta.fitness
+            self.trail = []
+            self.snapshot = None
+        elif self.snapshot is None:
+            self.trail.append(move)
+            if len(self.trail) > self.max_trail:
+                self.snapshot = self._rewind()
+                self.trail = []
+
+    def _rewind(self) -> Solution:
+        solution = self.current.clone()
+        for move in reversed(self.trail):
+            move.undo(solution)
+        return solution
+
+    def best(self) -> Solution:
+        return self.snapshot if self.snapshot is not None else self._rewind()
+
+
+def tabu_search(
+        tasks: List[Task],
+        programmers_specs: List[Tuple[str, float]],
+        releases: List[Release],
+        init_strategy: str = "priority_div_cost",
+        max_iterations: int = 2000,
+        neighbours: int = 100,
+        tenure: int = 20,
+        dep_index: DependencyIndex = None,
+        stopping: StoppingCriteria = None,
+        callbacks: List[Callback] = None,
+) -> Solution:
+    """
+    Tabu search over the swap and move neighbourhood of hill_climbing. Every iteration scores
+    neighbours random neighbours incrementally and commits the best one, even when it is worse,
+    unless it moves a task moved in the last tenure iterations and does not beat the best
+    fitness found. Returns the best solution found. The GenerationStats of every iteration go to
+    callbacks (printed every 100 iterations when None, nowhere when empty).
+    """
+    if stopping is not None:
+        stopping.start()
+    telemetry = Telemetry("tabu_search", callbacks, print_interval=100)
+    current = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
+    table = TaskTable.from_tasks(tasks, dep_index)
+    evaluator = DeltaEvaluator(current, tasks, releases, table=table)
+    best = _BestTracker(current, evaluator.fitness())
+    tabu_until = {}
+
+    telemetry.count(1)
+    telemetry.note(f"Tabu search initial fitness: {round(best.fitness, 2)}")
+    stop = stopping is not None and stopping.update(best.fitness, 1)
+
+    for it in range(max_iterations):
+        if stop:
+            telemetry.note(f"Tabu search stopped at iter {it}: {stopping.reason}")
+            break
+        chosen = None
+        chosen_move = None
+        chosen_tasks = ()
+        scores = []
+        for _ in range(neighbours):
+            move = random_neighbor(current)
+            if move is None:
+                continue
+            delta = evaluator.evaluate(move)
+            scores.append(delta.fitness)
+            if chosen is not None and delta.fitness <= chosen.fitness:
+                continue
+            touched = move.tasks(current)
+            if delta.fitness <= best.fitness and any(tabu_until.get(t, -1) >= it for t in touched):
+                continue
+            chosen = delta
+            chosen_move = move
+            chosen_tasks = touched
+        if chosen is None:
+            telemetry.note(f"Tabu search stopped at iter {it}: every neighbour is tabu")
+            break
+
+        for task_id in chosen_tasks:
+            tabu_until[task_id] = it + tenure
+        best.commit(evaluator, chosen_move, chosen)
+
+        telemetry.report(it, len(scores), best.fitness, scores, current_fitness=evaluator.fitness())
+        stop = stopping is not None and stopping.update(best.fitness, neighbours)
+
+    return best.best()
+
+
+def simulated_annealing(
+        tasks: List[Task],
+        programmers_specs: List[Tuple[str, float]],
+        releases: List[Release],
+        init_strategy: str = "priority_div_cost",
+        max_steps: int = 200000,
+        initial_temperature: float = None,
+        final_temperature: float = 1.0,
+        dep_index: DependencyIndex = None,
+        stopping: StoppingCriteria = None,
+        callbacks: List[Callback] = None,
+) -> Solution:
+    """
+    Simulated annealing over the swap and move neighbourhood of hill_climbing. A random neighbour
+    is committed when it is not worse, or worse by d with probability exp(-d / T). T decreases
+    geometrically from initial_temperature (by default the mean loss of 100 random worse
+    neighbours) to final_temperature over max_steps, or over the time budget of stopping when it
+    runs out first. Returns the best solution found. The temperature is updated, stopping
+    checked and the GenerationStats of the last 1000 steps sent to callbacks every 1000 steps
+    (printed every 10000 steps when None, nowhere when empty).
+    """
+    if final_temperature <= 0:
+        raise ValueError(f"final_temperature must be positive, got {final_temperature}")
+    if stopping is not None:
+        stopping.start()
+    telemetry = Telemetry("simulated_annealing", callbacks, print_interval=10000)
+    current = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
+    table = TaskTable.from_tasks(tasks, dep_index)
+    evaluator = DeltaEvaluator(current, tasks, releases, table=table)
+    best = _BestTracker(current, evaluator.fitness())
+    telemetry.count(1)
+
+    if initial_temperature is None:
+        losses = []
+        for _ in range(100):
+            move = random_neighbor(current)
+            if move is not None:
+                losses.append(evaluator.fitness() - evaluator.evaluate(move).fitness)
+        losses = [loss for loss in losses if loss > 0]
+        initial_temperature = sum(losses) / len(losses) if losses else final_temperature
+    temperature = initial_temperature
+    ratio = min(1.0, final_temperature / initial_temperature)
+
+    telemetry.note(f"SA initial fitness: {round(best.fitness, 2)}, temperature: {round(temperature, 2)}")
+    stop = stopping is not None and stopping.update(best.fitness, 1)
+    scores = []
+
+    for step in range(max_steps):
+        if step % 1000 == 0 and step > 0:
+            progress = step / max_steps
+            if stopping is not None and stopping.time_budget:
+                progress = max(progress, stopping.elapsed / stopping.time_budget)
+            temperature = initial_temperature * ratio ** min(progress, 1.0)
+            telemetry.report(step, len(scores), best.fitness, scores, current_fitness=evaluator.fitness(),
+                             temperature=temperature)
+            scores = []
+            stop = stopping is not None and stopping.update(best.fitness, 1000)
+        if stop:
+            telemetry.note(f"SA stopped at step {step}: {stopping.reason}")
+            break
+        move = random_neighbor(current)
+        if move is None:
+            break
+        delta = evaluator.evaluate(move)
+        scores.append(delta.fitness)
+        change = delta.fitness - evaluator.fitness()
+        if change >= 0 or random.random() < math.exp(change / temperature):
+            best.commit(evaluator, move, delta)
+
+    return best.best()
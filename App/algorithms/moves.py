@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Tuple, TYPE_CHECKING
+
+from solution import Solution
+
+if TYPE_CHECKING:
+    from algorithms.delta_fitness import Delta, DeltaEvaluator
+
+
+class Move(ABC):
+    """
+    A neighbour of a solution as a change that can be scored by a DeltaEvaluator without being
+    applied, applied in place and undone in place. Moves only hold plan positions, so they are
+    cheap to create and to send to other processes.
+    """
+
+    @abstractmethod
+    def score(self, evaluator: DeltaEvaluator) -> Delta:
+        ...
+
+    @abstractmethod
+    def apply(self, solution: Solution) -> None:
+        ...
+
+    @abstractmethod
+    def undo(self, solution: Solution) -> None:
+        """Revert apply, on the solution as apply left it."""
+
+    @abstractmethod
+    def tasks(self, solution: Solution) -> Tuple[int, ...]:
+        """Ids of the tasks whose place the move changes, read before it is applied."""
+
+
+@dataclass(frozen=True)
+class Swap(Move):
+    """Swap positions idx1 and idx2 of programmer p's plan."""
+    p: int
+    idx1: int
+    idx2: int
+
+    def score(self, evaluator: DeltaEvaluator) -> Delta:
+        return evaluator.evaluate_swap(self.p, self.idx1, self.idx2)
+
+    def apply(self, solution: Solution) -> None:
+        plan = solution.programmers[self.p].work_plan
+        plan[self.idx1], plan[self.idx2] = plan[self.idx2], plan[self.idx1]
+
+    def undo(self, solution: Solution) -> None:
+        self.apply(solution)
+
+    def tasks(self, solution: Solution) -> Tuple[int, ...]:
+        plan = solution.programmers[self.p].work_plan
+        return plan[self.idx1], plan[self.idx2]
+
+
+@dataclass(frozen=True)
+class Relocate(Move):
+    """Move the task at position idx of programmer src to position insert_idx of programmer dst."""
+    src: int
+    idx: int
+    dst: int
+    insert_idx: int
+
+    def score(self, evaluator: DeltaEvaluator) -> Delta:
+        return evaluator.evaluate_move(self.src, self.idx, self.dst, self.insert_idx)
+
+    def apply(self, solution: Solution) -> None:
+        task_id = solution.programmers[self.src].work_plan.pop(self.idx)
+        solution.programmers[self.dst].work_plan.insert(self.insert_idx, task_id)
+
+    def undo(self, solution: Solution) -> None:
+        task_id = solution.programmers[self.dst].work_plan.pop(self.insert_idx)
+        solution.programmers[self.src].work_plan.insert(self.idx, task_id)
+
+    def tasks(self, solution: Solution) -> Tuple[int, ...]:
+        return (solution.programmers[self.src].work_plan[self.idx],)
+
+
+@dataclass(frozen=True)
+class BlockMove(Move):
+    """Move positions start..stop of programmer src's plan, in order, to position insert_idx of programmer dst."""
+    src: int
+    start: int
+    stop: int
+    dst: int
+    insert_idx: int
+
+    def score(self, evaluator: DeltaEvaluator) -> Delta:
+        return evaluator.evaluate_block_move(self.src, self.start, self.stop, self.dst, self.insert_idx)
+
+    def apply(self, solution: Solution) -> None:
+        src_plan = solution.programmers[self.src].work_plan
+        block = src_plan[self.start:self.stop]
+        del src_plan[self.start:self.stop]
+        solution.programmers[self.dst].work_plan[self.insert_idx:self.insert_idx] = block
+
+    def undo(self, solution: Solution) -> None:
+        dst_plan = solution.programmers[self.dst].work_plan
+        end = self.insert_idx + self.stop - self.start
+        block = dst_plan[self.insert_idx:end]
+        del dst_plan[self.insert_idx:end]
+        solution.programmers[self.src].work_plan[self.start:self.start] = block
+
+    def tasks(self, solution: Solution) -> Tuple[int, ...]:
+        return tuple(solution.programmers[self.src].work_plan[self.start:self.stop])
+
+
+def random_swap_neighbor(solution: Solution) -> Swap:
+    """A Swap inside one programmer's plan, None when no plan has two tasks."""
+    candidates = [p for p, prog in enumerate(solution.programmers) if len(prog.work_plan) >= 2]
+    if not candidates:
+        return None
+    p = random.choice(candidates)
+    idx1 = random.randrange(len(solution.programmers[p].work_plan))
+    idx2 = random.randrange(len(solution.programmers[p].work_plan))
+    return Swap(p, idx1, idx2)
+
+
+def random_move_neighbor(solution: Solution) -> Relocate:
+    """A Relocate of one task to another programmer, None when there is none."""
+    src_candidates = [p for p, prog in enumerate(solution.programmers) if len(prog.work_plan) >= 1]
+    if len(src_candidates) < 1 or len(solution.programmers) < 2:
+        return None
+
+    p1 = random.choice(src_candidates)
+    p2 = random.choice([p for p in range(len(solution.programmers)) if p != p1])
+
+    task_idx = random.randrange(len(solution.programmers[p1].work_plan))
+    insert_idx = random.randrange(len(solution.programmers[p2].work_plan) + 1)
+    return Relocate(p1, task_idx, p2, insert_idx)
+
+
+def random_block_neighbor(solution: Solution, max_block: int = 5) -> BlockMove:
+    """A BlockMove of up to max_block consecutive tasks to another programmer, None when there is none."""
+    src_candidates = [p for p, prog in enumerate(solution.programmers) if len(prog.work_plan) >= 1]
+    if len(src_candidates) < 1 or len(solution.programmers) < 2:
+        return None
+
+    p1 = random.choice(src_candidates)
+    p2 = random.choice([p for p in range(len(solution.programmers)) if p != p1])
+
+    length = random.randint(1, min(max_block, len(solution.programmers[p1].work_plan)))
+    start = random.randrange(len(solution.programmers[p1].work_plan) - length + 1)
+    insert_idx = random.randrange(len(solution.programmers[p2].work_plan) + 1)
+    return BlockMove(p1, start, start + length, p2, insert_idx)
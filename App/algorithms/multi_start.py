@@ -0,0 +1,133 @@
+import contextlib
+import io
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from release import Release
+from task import Task
+from solution import Solution
+from genome import Genome
+from dependency_index import DependencyIndex
+from algorithms.fitness_function import fitness_function
+from algorithms.greedy import greedy
+from algorithms.hill_climbing import hill_climbing
+from algorithms.stopping import StoppingCriteria
+
+START_STRATEGIES = ("random", "priority_cost", "priority_div_cost", "greedy")
+
+
+@dataclass
+class StartResult:
+    """Statistics of one hill-climbing start of multi_start_hill_climbing."""
+    start: int
+    seed: int
+    init_strategy: str
+    initial_fitness: float
+    fitness: float
+    evaluations: int
+    seconds: float
+
+    def __str__(self) -> str:
+        return (f"Start {self.start} ({self.init_strategy}, seed {self.seed}): "
+                f"{round(self.initial_fitness, 2)} -> {round(self.fitness, 2)}, "
+                f"{self.evaluations} evaluations in {round(self.seconds, 2)}s")
+
+
+# State of a pool worker, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(tasks, programmers_specs, releases, dep_index, greedy_genome, deadline, max_iterations) -> None:
+    _worker.update(tasks=tasks, programmers_specs=programmers_specs, releases=releases, dep_index=dep_index,
+                   greedy_genome=greedy_genome, deadline=deadline, max_iterations=max_iterations)
+
+
+def _run_start(job) -> Tuple[StartResult, Genome]:
+    start, seed, init_strategy = job
+    deadline = _worker["deadline"]
+    if deadline is not None and time.monotonic() >= deadline and start > 0:
+        return None, None
+    tasks, releases, dep_index = _worker["tasks"], _worker["releases"], _worker["dep_index"]
+    began = time.perf_counter()
+    random.seed(seed)
+    if init_strategy == "greedy":
+        initial = _worker["greedy_genome"].to_solution()
+    else:
+        initial = Solution().initialize(_worker["programmers_specs"], tasks.copy(), init_strategy)
+    stopping = StoppingCriteria(time_budget=max(0.0, deadline - time.monotonic()) if deadline is not None else None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = hill_climbing(tasks, _worker["programmers_specs"], releases, max_iterations=_worker["max_iterations"],
+                                 dep_index=dep_index, stopping=stopping, initial_solution=initial, callbacks=[])
+    result = StartResult(
+        start=start,
+        seed=seed,
+        init_strategy=init_strategy,
+        initial_fitness=fitness_function(initial, tasks, releases, dep_index=dep_index),
+        fitness=fitness_function(solution, tasks, releases, dep_index=dep_index),
+        evaluations=stopping.evaluations,
+        seconds=time.perf_counter() - began,
+    )
+    return result, Genome.from_solution(solution)
+
+
+def multi_start_hill_climbing(
+        tasks: List[Task],
+        programmers_specs: List[Tuple[str, float]],
+        releases: List[Release],
+        starts: int = 8,
+        strategies: Tuple[str, ...] = START_STRATEGIES,
+        max_iterations: int = 200,
+        time_budget: float = None,
+        dep_index: DependencyIndex = None,
+        workers: int = 1,
+) -> Tuple[Solution, List[StartResult]]:
+    """
+    Runs starts independent hill_climbing runs across workers processes and returns the best
+    solution with the statistics of every start. Start i begins from strategies[i % len(strategies)]
+    ("greedy" being the plan of greedy(), whose dropped tasks stay unplanned) with its own seed,
+    so results do not depend on workers. All starts share time_budget seconds: a start launched
+    late only gets the time left, and starts not launched in time are skipped (the first one
+    always runs). The caller's random state is left as it was after drawing the starts' seeds.
+    """
+    for strategy in strategies:
+        if strategy not in START_STRATEGIES:
+            raise ValueError(f"Unknown initialization strategy: {strategy}")
+    if dep_index is None:
+        dep_index = DependencyIndex.from_tasks(tasks)
+    # CLOCK_MONOTONIC is shared by the worker processes
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    greedy_genome = None
+    if "greedy" in strategies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            greedy_genome = Genome.from_solution(greedy(tasks, programmers_specs, releases, dep_index=dep_index))
+    jobs = [(i, random.randrange(2 ** 32), strategies[i % len(strategies)]) for i in range(starts)]
+    initargs = (tasks, programmers_specs, releases, dep_index, greedy_genome, deadline, max_iterations)
+
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            outcomes = pool.map(_run_start, jobs, chunksize=1)
+    else:
+        # the starts reseed the global generator, which is the caller's one in this process
+        state = random.getstate()
+        _init_worker(*initargs)
+        try:
+            outcomes = [_run_start(job) for job in jobs]
+        finally:
+            random.setstate(state)
+
+    best = None
+    best_fitness = float('-inf')
+    results = []
+    for result, genome in outcomes:
+        if result is None:
+            continue
+        results.append(result)
+        print(result)
+        if result.fitness > best_fitness:
+            best_fitness = result.fitness
+            best = genome.to_solution()
+    print(f"Multi-start HC: {len(results)} of {starts} starts run, best fitness {round(best_fitness, 2)}")
+    return best, results
@@ -0,0 +1,188 @@
+import multiprocessing
+import weakref
+from array import array
+from itertools import chain
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+from release import Release
+from solution import Solution
+from genome import Genome
+from dependency_index import DependencyIndex
+from task_table import TaskTable
+from algorithms.batch_fitness import _evaluate
+from algorithms.delta_fitness import DeltaEvaluator
+
+_TABLE_FIELDS = ("cost", "priority")
+_INDEX_FIELDS = ("dep_ptr", "dep_ids", "rev_ptr", "rev_ids", "level", "component")
+
+
+def publish_table(table: TaskTable) -> Tuple[List[shared_memory.SharedMemory], dict]:
+    """
+    Copy the arrays of table into shared memory blocks.
+    Returns the blocks (owned by the caller, who must unlink them) and a picklable spec for attach_table.
+    """
+    blocks = []
+    spec = {}
+    arrays = [(name, getattr(table, name)) for name in _TABLE_FIELDS]
+    arrays += [(name, getattr(table.dependencies, name)) for name in _INDEX_FIELDS]
+    for name, values in arrays:
+        block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        blocks.append(block)
+        spec[name] = (block.name, values.shape, values.dtype.str)
+    return blocks, spec
+
+
+def attach_table(spec: dict) -> Tuple[TaskTable, List[shared_memory.SharedMemory]]:
+    """Rebuild a TaskTable whose arrays are views of the shared memory blocks described by spec."""
+    blocks = []
+    arrays = {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    dep_index = DependencyIndex(**{name: arrays[name] for name in _INDEX_FIELDS})
+    table = TaskTable(cost=arrays["cost"], priority=arrays["priority"], dependencies=dep_index)
+    return table, blocks
+
+
+def encode(individual: Solution) -> Genome:
+    """Compact genome of an individual (a copy, even for genome-backed individuals), cheap to pickle."""
+    return Genome.from_solution(individual)
+
+
+def decode(genome: Genome) -> Solution:
+    return genome.to_solution()
+
+
+def _release_resources(pool, blocks) -> None:
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def stop_workers(connections, processes: List[multiprocessing.Process], timeout: float = 5.0) -> None:
+    """
+    Send ("stop", None) to the worker processes at the other end of connections and wait for them.
+    Workers that already died are skipped, workers still running after timeout seconds are terminated.
+    """
+    for conn in connections:
+        try:
+            conn.send(("stop", None))
+        except OSError:
+            pass
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    for conn in connections:
+        conn.close()
+
+
+# State of a pool worker, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(spec: dict, releases: List[Release]) -> None:
+    table, blocks = attach_table(spec)
+    _worker["table"] = table
+    _worker["blocks"] = blocks
+    _worker["releases"] = releases
+
+
+def _evaluate_chunk(chunk) -> List[float]:
+    genomes, active_ids = chunk
+    population = [genome.as_solution() for genome in genomes]
+    return _evaluate(population, _worker["releases"], active_ids, _worker["table"]).tolist()
+
+
+class ParallelEvaluator:
+    """
+    Scores populations across a process pool. The task table is published once through shared
+    memory, so workers only receive compact genomes. Every worker scores a contiguous chunk of
+    the population with the batch fitness, so results do not depend on the number of workers.
+    """
+
+    def __init__(self, table: TaskTable, releases: List[Release], workers: int):
+        self.workers = workers
+        self._blocks, spec = publish_table(table)
+        self._pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(spec, releases))
+        self._finalizer = weakref.finalize(self, _release_resources, self._pool, self._blocks)
+
+    def evaluate(self, population: List[Solution], active_ids=None) -> np.ndarray:
+        if not population:
+            return np.zeros(0)
+        active = array("i", active_ids) if active_ids is not None else None
+        size = -(-len(population) // self.workers)
+        chunks = [([encode(individual) for individual in population[i:i + size]], active)
+                  for i in range(0, len(population), size)]
+        return np.array(list(chain.from_iterable(self._pool.map(_evaluate_chunk, chunks))))
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def _neighbourhood_worker(conn, spec: dict, releases: List[Release], genome: Genome, active_ids) -> None:
+    table, blocks = attach_table(spec)
+    evaluator = DeltaEvaluator(decode(genome), None, releases, active_ids, table=table)
+    while True:
+        command, payload = conn.recv()
+        match command:
+            case "score":
+                conn.send([evaluator.evaluate(move).fitness for move in payload])
+            case "commit":
+                evaluator.commit(evaluator.evaluate(payload))
+            case _:
+                break
+    for block in blocks:
+        block.close()
+
+
+class ParallelNeighbourhood:
+    """
+    Scores neighbour moves of one solution across worker processes. Every worker keeps its own
+    copy of the solution with a DeltaEvaluator, and committed moves are broadcast to all of them.
+    """
+
+    def __init__(self, solution: Solution, table: TaskTable, releases: List[Release], workers: int, active_ids=None):
+        self._blocks, spec = publish_table(table)
+        genome = encode(solution)
+        self._connections = []
+        self._processes = []
+        for _ in range(workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_neighbourhood_worker,
+                args=(child_conn, spec, releases, genome, active_ids),
+                daemon=True,
+            )
+            process.start()
+            # only the worker holds its end, so recv() raises EOFError when it dies
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(self, _release_resources, None, self._blocks)
+
+    def score(self, moves: List[tuple]) -> List[float]:
+        size = -(-len(moves) // len(self._connections)) if moves else 1
+        chunks = [moves[i:i + size] for i in range(0, len(moves), size)]
+        for conn, chunk in zip(self._connections, chunks):
+            conn.send(("score", chunk))
+        return list(chain.from_iterable(conn.recv() for conn, _ in zip(self._connections, chunks)))
+
+    def commit(self, move: tuple) -> None:
+        for conn in self._connections:
+            conn.send(("commit", move))
+
+    def close(self) -> None:
+        try:
+            stop_workers(self._connections, self._processes)
+        finally:
+            self._finalizer()
@@ -1,10 +1,53 @@
 import random
-from typing import List, Tuple
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Set, Tuple
+
+import numpy as np
 
 from release import Release
 from task import Task
 from solution import Solution
-from algorithms.fitness_function import fitness_function
+from task_table import TaskTable
+from dependency_index import DependencyIndex
+from algorithms.batch_fitness import batch_fitness_function
+from algorithms.fitness_cache import FitnessCache, ProgrammerCache
+from algorithms.parallel import ParallelEvaluator
+from algorithms.stopping import StoppingCriteria
+from algorithms.telemetry import Callback, Telemetry
+
+
+@dataclass
+class Horizon:
+    """
+    State carried from one release to the next by a rolling-horizon call_slow_genetic:
+    the last population and the table, caches and worker pool it was scored with.
+    """
+    population: List[Solution] = None
+    table: TaskTable = None
+    cache: FitnessCache = None
+    programmer_cache: ProgrammerCache = None
+    executor: ParallelEvaluator = None
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.close()
+        if self.cache is not None:
+            print(self.cache.report())
+        if self.programmer_cache is not None:
+            print(self.programmer_cache.report())
+
+
+def refreeze(individual: Solution, best: Solution, frozen_tasks: Set[int]) -> Solution:
+    """
+    Give individual the frozen tasks of best, at the head of the same programmers' plans
+    and in the same order, followed by its own order of the other tasks.
+    """
+    for prog, best_prog in zip(individual.programmers, best.programmers):
+        movable = [t for t in prog.work_plan if t not in frozen_tasks]
+        prog.work_plan[:] = [t for t in best_prog.work_plan if t in frozen_tasks] + movable
+    return individual
 
 
 def slow_genetic(
@@ -19,8 +62,22 @@ def slow_genetic(
         tournament_size: int = 15,
         initial_solution = None,
         current_release = 0,
-        active_id=None
+        active_id=None,
+        dep_index: DependencyIndex = None,
+        fitness_cache_size: int = 0,
+        programmer_cache_size: int = 0,
+        workers: int = 1,
+        stopping: StoppingCriteria = None,
+        horizon: Horizon = None,
+        telemetry: Telemetry = None,
 ) -> Solution:
+    """
+    Genetic algorithm for the tasks of active_id in which the tasks initial_solution plans
+    before current_release are frozen. With a horizon, the population it carries (re-frozen
+    on initial_solution) is evolved further instead of mutated clones of initial_solution,
+    and the final population, caches and worker pool are left in it for the next release.
+    Generations are reported to telemetry (a printing one when None) as generations of current_release.
+    """
     def select() -> int:
         selected = random.randrange(0, len(population))
         for _ in range(tournament_size - 1):
@@ -29,12 +86,19 @@ def slow_genetic(
                 selected = candidate
         return selected
 
-    def apply_swap(indiv, src_list, dst_list):
-        for prog in indiv.programmers:
-            for i in range(len(prog.work_plan)):
-                for j in range(len(src_list)):
-                    if prog.work_plan[i] == src_list[j]:
-                        prog.work_plan[i] = dst_list[j]
+    def parent_position(p: int, task_id: int) -> Tuple[int, int]:
+        # (programmer index, position) of task_id in population[p], through a position index
+        # (flat position of every task and the end of every work plan) built once per generation
+        if p not in index_cache:
+            flat = population[p].flatten()
+            positions = np.empty(len(tasks), dtype=np.int64)
+            positions[flat] = np.arange(len(flat))
+            ends = list(accumulate(len(prog.work_plan) for prog in population[p].programmers))
+            index_cache[p] = positions.tolist(), ends
+        positions, ends = index_cache[p]
+        k = positions[task_id]
+        q = bisect_right(ends, k)
+        return q, k - (ends[q - 1] if q else 0)
 
     def crossover(p1: int, p2: int) -> Tuple[Solution, Solution]: #this is a simpler crossover
         if random.random() > crossover_rate:
@@ -42,17 +106,26 @@ def slow_genetic(
 
         child1 = population[p1].clone()
         child2 = population[p2].clone()
-        prog1 = random.choice(child1.programmers)
-        prog2 = random.choice(child2.programmers)
-        free1 =  [i for i, t in enumerate(prog1.work_plan) if t not in frozen_tasks]
-        free2 =  [i for i, t in enumerate(prog2.work_plan) if t not in frozen_tasks]
-        
-        if free1 == [] or free2 == []:
+        q1 = random.randrange(len(child1.programmers))
+        q2 = random.randrange(len(child2.programmers))
+        prog1 = child1.programmers[q1]
+        prog2 = child2.programmers[q2]
+        # free positions are the ones after the frozen prefix
+        if frozen_prefix[q1] >= len(prog1.work_plan) or frozen_prefix[q2] >= len(prog2.work_plan):
             return child1, child2
-        i1 = random.choice(free1)
-        i2 = random.choice(free2)
-        
-        prog1.work_plan[i1], prog2.work_plan[i2] = prog2.work_plan[i2],prog1.work_plan[i1]
+        i1 = random.randrange(frozen_prefix[q1], len(prog1.work_plan))
+        i2 = random.randrange(frozen_prefix[q2], len(prog2.work_plan))
+
+        # each child takes the other's task; the task it gives up goes where the new one was,
+        # so children stay permutations (the new task is free too, frozen tasks being shared).
+        # Children are unchanged clones so far, so the parents' position indexes locate it.
+        task1, task2 = prog1.work_plan[i1], prog2.work_plan[i2]
+        if task1 != task2:
+            q, i = parent_position(p1, task2)
+            child1.programmers[q].work_plan[i] = task1
+            q, i = parent_position(p2, task1)
+            child2.programmers[q].work_plan[i] = task2
+        prog1.work_plan[i1], prog2.work_plan[i2] = task2, task1
         
         return child1, child2
 
@@ -60,60 +133,87 @@ def slow_genetic(
         if random.random() > mutation_rate:
             return individual
         # backup = individual.clone()
-        prog1 = random.choice(individual.programmers)
-        movable = [i for i,t in enumerate(prog1.work_plan) if t not in frozen_tasks]
-        if not movable:
+        q1 = random.randrange(len(individual.programmers))
+        prog1 = individual.programmers[q1]
+        first1 = frozen_prefix[q1]
+        if first1 >= len(prog1.work_plan):
             return individual
         if random.random() > 0.5:
             # swap two tasks in a programmer's work plan
-            if len(movable) <2:
+            if len(prog1.work_plan) - first1 < 2:
                 return individual
-            idx1 = random.choice(movable)
-            idx2 = random.choice(movable)
+            idx1 = random.randrange(first1, len(prog1.work_plan))
+            idx2 = random.randrange(first1, len(prog1.work_plan))
             prog1.work_plan[idx1], prog1.work_plan[idx2] = prog1.work_plan[idx2], prog1.work_plan[idx1]
         else:
-            # move a task from one programmer to another
-            prog2 = random.choice([p for p in individual.programmers if p is not prog1])
-            task1 = prog1.work_plan.pop(random.choice(movable))
-            prog2.work_plan.insert(random.randrange(len(prog2.work_plan)), task1)
+            # move a task from one programmer to another, never into a frozen prefix
+            q2 = random.choice([q for q in range(len(individual.programmers)) if q != q1])
+            prog2 = individual.programmers[q2]
+            first2 = frozen_prefix[q2]
+            task1 = prog1.work_plan.pop(random.randrange(first1, len(prog1.work_plan)))
+            if first2 < len(prog2.work_plan):
+                prog2.work_plan.insert(random.randrange(first2, len(prog2.work_plan)), task1)
+            else:
+                prog2.work_plan.append(task1)
         return individual
 
     # Initialize
+    if stopping is not None:
+        stopping.reset_progress()
+    if telemetry is None:
+        telemetry = Telemetry("slow_genetic")
+    # Tasks planned before current_release form a prefix of every work plan (releases follow the
+    # plan order), operators keep it in place so only positions after frozen_prefix[p] are movable
     frozen_tasks = set()
+    frozen_prefix = [0] * len(programmers_specs)
     if initial_solution != None:
-        for prog in initial_solution.programmers:
+        for p, prog in enumerate(initial_solution.programmers):
             _, _, _, task_to_release = prog.evaluate_work_plan(tasks, releases)
             for task_id, i in task_to_release.items():
                 if i < current_release:
                     frozen_tasks.add(task_id)
+                    frozen_prefix[p] += 1
     
+    if horizon is not None and horizon.table is not None:
+        table, cache, programmer_cache, executor = (horizon.table, horizon.cache, horizon.programmer_cache,
+                                                    horizon.executor)
+    else:
+        table = TaskTable.from_tasks(tasks, dep_index)
+        cache = FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None
+        programmer_cache = ProgrammerCache(programmer_cache_size) if programmer_cache_size > 0 else None
+        executor = ParallelEvaluator(table, releases, workers) if workers > 1 else None
     population = []
-    fitness = []
     best_fitness = float('-inf')
     best = None
 
     if initial_solution == None:
         for _ in range(population_size):
-            individual = Solution().initialize(programmers_specs, tasks.copy(), init_strategy)
-            population.append(individual)
-            fit = fitness_function(individual, tasks, releases, active_ids=active_id)
-            fitness.append(fit)
-            if fit > best_fitness:
-                best_fitness = fit
-                best = individual
+            population.append(Solution().initialize(programmers_specs, tasks.copy(), init_strategy))
+    elif horizon is not None and horizon.population:
+        # warm start: newly active tasks are already planned by every individual,
+        # only the releases completed since are frozen again
+        population = [initial_solution.clone()]
+        population += [refreeze(individual, initial_solution, frozen_tasks)
+                       for individual in horizon.population[:population_size - 1]]
     else:
         for _ in range(population_size):
-            individual = mutate(initial_solution.clone())
-            population.append(individual)
-            fit = fitness_function(individual, tasks, releases, active_ids=active_id)
-            fitness.append(fit)
-            if fit > best_fitness:
-                best_fitness = fit
-                best = individual
+            population.append(mutate(initial_solution.clone()))
+    fitness = batch_fitness_function(population, tasks, releases, active_ids=active_id, table=table, cache=cache,
+                                     programmer_cache=programmer_cache, executor=executor).tolist()
+    for i in range(population_size):
+        if fitness[i] > best_fitness:
+            best_fitness = fitness[i]
+            best = population[i]
+    telemetry.count(population_size)
+    stop = stopping is not None and stopping.update(best_fitness, population_size)
 
     # Evolve population
     for gen in range(generations):
+        if stop:
+            telemetry.note(f"Stopped before generation {gen}: {stopping.reason}")
+            break
         new_population = []
+        index_cache = {}
         while len(new_population) < population_size:
             parent1 = select()
             parent2 = select()
@@ -124,18 +224,38 @@ def slow_genetic(
             new_population.append(child2)
         population = new_population
 
+        fitness = batch_fitness_function(population, tasks, releases, active_ids=active_id, table=table, cache=cache,
+                                         programmer_cache=programmer_cache, executor=executor).tolist()
         for i in range(population_size):
-            fitness[i] = fitness_function(population[i], tasks, releases, active_ids=active_id)
             if fitness[i] > best_fitness:
                 best_fitness = fitness[i]
                 best = population[i].clone()
 
-        if  gen % 10 == 0:
-            print(f"Generation: {gen}, best fitness: {round(best_fitness, 2)}")
+        telemetry.report(gen, population_size, best_fitness, fitness, population, cache, programmer_cache,
+                         release=current_release)
+        stop = stopping is not None and stopping.update(best_fitness, population_size)
 
+    if horizon is None:
+        horizon = Horizon(table=table, cache=cache, programmer_cache=programmer_cache, executor=executor)
+        horizon.close()
+    else:
+        horizon.population = population
+        horizon.table, horizon.cache, horizon.programmer_cache, horizon.executor = (
+            table, cache, programmer_cache, executor)
     return best
 
-def call_slow_genetic(tasks: List[Task],programmers_specs: List[Tuple[str, float]],releases: List[Release],):
+def call_slow_genetic(tasks: List[Task],programmers_specs: List[Tuple[str, float]],releases: List[Release],
+                      dep_index: DependencyIndex = None, fitness_cache_size: int = 0,
+                      programmer_cache_size: int = 0, workers: int = 1, stopping: StoppingCriteria = None,
+                      generations: int = 100, rolling: bool = False, rolling_generations: int = 25,
+                      callbacks: List[Callback] = None):
+    """
+    Plans the releases one after the other with slow_genetic. A stopping budget (time, evaluations)
+    is shared by all releases, the releases left once it is used keep the plan found so far.
+    With rolling, the population, caches and worker pool are carried from one release to the next
+    (rolling horizon) and every release after the first is only evolved for rolling_generations.
+    The GenerationStats of every generation, with the release it plans, go to callbacks as in genetic().
+    """
     weights = [1 ** i for i in range(len(releases))]
     total = sum(weights)
     probs = [w/total for w in weights]
@@ -145,9 +265,22 @@ def call_slow_genetic(tasks: List[Task],programmers_specs: List[Tuple[str, float
         split_tasks[x].append(t)
     
     solution = None
-    
+    if dep_index is None:
+        dep_index = DependencyIndex.from_tasks(tasks)
+    if stopping is not None:
+        stopping.start()
+    horizon = Horizon() if rolling else None
+    telemetry = Telemetry("slow_genetic", callbacks)
+
     for i in range(len(releases)):
         current_tasks = [t for j in range(i+1) for t in split_tasks[j]]
         active = {t.id for t in current_tasks}
-        solution = slow_genetic(tasks, programmers_specs, releases, initial_solution = solution, current_release = i, active_id= active)
+        solution = slow_genetic(tasks, programmers_specs, releases,
+                                generations=rolling_generations if rolling and i > 0 else generations,
+                                initial_solution = solution, current_release = i, active_id= active,
+                                dep_index=dep_index, fitness_cache_size=fitness_cache_size,
+                                programmer_cache_size=programmer_cache_size, workers=workers, stopping=stopping,
+                                horizon=horizon, telemetry=telemetry)
+    if horizon is not None:
+        horizon.close()
     return solution
\ No newline at end of file
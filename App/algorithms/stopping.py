@@ -0,0 +1,119 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from release import Release
+from task import Task, MAX_PRIORITY
+from programmer import PROGRAMMING_HOURS_IN_WORK_DAY
+
+
+@dataclass
+class StoppingCriteria:
+    """
+    Conditions that end an anytime search before its generations/iterations limit.
+    Criteria left to None are not checked.
+
+    Attributes:
+        time_budget: Seconds of wall-clock time since start().
+        max_evaluations: Number of fitness evaluations since start().
+        stagnation: Generations (or iterations) in a row without improvement of the best fitness.
+        target_fitness: Best fitness that is good enough, e.g. fitness_upper_bound().
+        evaluations: Fitness evaluations reported through update() so far.
+        reason: Why the search should stop, None while it should go on.
+    """
+    time_budget: float = None
+    max_evaluations: int = None
+    stagnation: int = None
+    target_fitness: float = None
+    evaluations: int = field(default=0, init=False)
+    reason: str = field(default=None, init=False)
+    _started: float = field(default=None, init=False, repr=False)
+    _best: float = field(default=float('-inf'), init=False, repr=False)
+    _stale: int = field(default=0, init=False, repr=False)
+
+    def start(self) -> None:
+        """Start the clock and forget evaluations and progress of a previous run."""
+        self._started = time.perf_counter()
+        self.evaluations = 0
+        self.reason = None
+        self.reset_progress()
+
+    def reset_progress(self) -> None:
+        """
+        Forget the best fitness seen, for searches made of several sub-problems whose fitness
+        values are not comparable. The clock (started here if needed) and evaluations keep running.
+        """
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._best = float('-inf')
+        self._stale = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started if self._started is not None else 0.0
+
+    def update(self, best_fitness: float, evaluations: int = 0) -> bool:
+        """
+        Record one generation (or iteration) that made evaluations fitness evaluations
+        and reached best_fitness. Returns True when the search should stop.
+        """
+        if self._started is None:
+            self.start()
+        self.evaluations += evaluations
+        if best_fitness > self._best:
+            self._best = best_fitness
+            self._stale = 0
+        else:
+            self._stale += 1
+
+        self.reason = None
+        if self.target_fitness is not None and best_fitness >= self.target_fitness:
+            self.reason = f"target fitness {round(self.target_fitness, 2)} reached"
+        elif self.time_budget is not None and self.elapsed >= self.time_budget:
+            self.reason = f"time budget of {self.time_budget}s used"
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.reason = f"{self.evaluations} fitness evaluations done"
+        elif self.stagnation is not None and self._stale >= self.stagnation:
+            self.reason = f"no improvement in {self._stale} generations"
+        return self.reason is not None
+
+
+def fitness_upper_bound(tasks: List[Task], programmers_specs: List[Tuple[str, float]], releases: List[Release],
+                        active_ids=None) -> float:
+    """
+    Upper bound of fitness_function: the team's capacity is pooled and tasks may be split
+    between releases, so the best plan fills the earliest releases with the tasks of highest
+    priority weight per minute of cost. No plan scores more, and only plans with every task
+    scheduled that early and no penalty reach it.
+    """
+    num_releases = len(releases)
+    team_efficiency = sum(efficiency for _, efficiency in programmers_specs)
+    limits = []
+    capacity = 0
+    for r in releases:
+        capacity += r.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60
+        limits.append(capacity * team_efficiency)
+
+    candidates = [(MAX_PRIORITY + 1 - t.priority, t.cost) for t in tasks
+                  if active_ids is None or t.id in active_ids]
+    candidates.sort(key=lambda c: c[0] / c[1] if c[1] > 0 else float('inf'), reverse=True)
+
+    bound = 0.0
+    used = 0.0
+    r = 0
+    for weight, cost in candidates:
+        if r == num_releases:
+            break
+        if cost <= 0:
+            bound += weight * 2 ** (num_releases - r)
+            continue
+        remaining = cost
+        while remaining > 0 and r < num_releases:
+            part = min(limits[r] - used, remaining)
+            if part <= 0:
+                r += 1
+                continue
+            bound += weight * part / cost * 2 ** (num_releases - r)
+            used += part
+            remaining -= part
+    return bound
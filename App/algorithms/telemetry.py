@@ -0,0 +1,178 @@
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Sequence
+
+from solution import Solution
+from algorithms.fitness_cache import LRUCache, genome_key
+
+
+@dataclass
+class GenerationStats:
+    """
+    Progress of a search after one generation (iteration for hill climbing and tabu search, step
+    for simulated annealing), as passed to callbacks.
+
+    Attributes:
+        algorithm: Name of the search reporting.
+        generation: Generation (or iteration, or step) number, from 0.
+        best_fitness: Best fitness found so far.
+        mean_fitness: Mean fitness of the generation's population (of the neighbours scored since
+            the last report for the local searches).
+        worst_fitness: Worst fitness of the same individuals.
+        diversity: Share of distinct plans in the population (mean over the islands of island_GA),
+            None when there is no population.
+        evaluations: Fitness evaluations since the search started.
+        evaluations_per_second: evaluations divided by elapsed.
+        elapsed: Seconds since the search started.
+        fitness_cache_hit_rate: Hit rate of the fitness cache so far, None without one.
+        programmer_cache_hit_rate: Hit rate of the programmer cache so far, None without one.
+        release: Release being planned by a release-by-release search, None otherwise.
+        current_fitness: Fitness of the current solution of tabu search and simulated annealing.
+        temperature: Temperature of simulated annealing.
+    """
+    algorithm: str
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    worst_fitness: float
+    diversity: float
+    evaluations: int
+    evaluations_per_second: float
+    elapsed: float
+    fitness_cache_hit_rate: float = None
+    programmer_cache_hit_rate: float = None
+    release: int = None
+    current_fitness: float = None
+    temperature: float = None
+
+
+# A callback is called with the GenerationStats of every generation that is a multiple of its
+# interval attribute (1 when it has none, the search's print interval when it is None), and a
+# callback with a note method is also given the messages of the search (see Telemetry.note)
+Callback = Callable[[GenerationStats], None]
+
+
+class PrintSink:
+    """
+    Prints the best fitness every interval generations, by default as often as each search
+    always did (every 10 generations, 100 tabu search iterations, 10000 annealing steps), and
+    the messages of the search.
+    """
+
+    def __init__(self, interval: int = None):
+        self.interval = interval
+
+    def note(self, message: str) -> None:
+        print(message)
+
+    def __call__(self, stats: GenerationStats) -> None:
+        match stats.algorithm:
+            case "hill_climbing":
+                print(f"Iteration: {stats.generation}, fitness: {round(stats.best_fitness, 2)}")
+            case "tabu_search":
+                print(f"Iteration: {stats.generation}, fitness: {round(stats.current_fitness, 2)}, "
+                      f"best fitness: {round(stats.best_fitness, 2)}")
+            case "simulated_annealing":
+                print(f"Step: {stats.generation}, fitness: {round(stats.current_fitness, 2)}, "
+                      f"best fitness: {round(stats.best_fitness, 2)}, temperature: {round(stats.temperature, 2)}")
+            case _:
+                print(f"Generation: {stats.generation}, best fitness: {round(stats.best_fitness, 2)}")
+
+
+class JsonlSink:
+    """
+    Appends every interval-th GenerationStats to file_path as one JSON object per line, flushed
+    as it is written so that long runs can be followed. Use as a context manager or close() it.
+    """
+
+    def __init__(self, file_path: str, interval: int = 1):
+        self.interval = interval
+        self._file = open(file_path, "a", encoding="utf-8")
+
+    def __call__(self, stats: GenerationStats) -> None:
+        self._file.write(json.dumps(asdict(stats)) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def population_diversity(population: Sequence[Solution]) -> float:
+    """Share of distinct plans in population."""
+    return len({genome_key(individual) for individual in population}) / len(population)
+
+
+class Telemetry:
+    """
+    Counts the evaluations and time of a search and hands its GenerationStats to callbacks
+    (a PrintSink when None, nothing when empty), callbacks with an interval of None taking
+    every print_interval-th generation. The
+    statistics of a generation are only computed when a callback wants it, so quiet runs pay
+    nothing but the evaluation count.
+    """
+
+    def __init__(self, algorithm: str, callbacks: List[Callback] = None, print_interval: int = 10):
+        self.algorithm = algorithm
+        self.callbacks = [PrintSink()] if callbacks is None else list(callbacks)
+        self.print_interval = print_interval
+        self.evaluations = 0
+        self._started = time.perf_counter()
+
+    def count(self, evaluations: int) -> None:
+        """Record evaluations made outside a reported generation, e.g. of the initial population."""
+        self.evaluations += evaluations
+
+    def _takes(self, callback: Callback, generation: int) -> bool:
+        interval = getattr(callback, "interval", 1)
+        return generation % (self.print_interval if interval is None else interval) == 0
+
+    def note(self, message: str) -> None:
+        """Pass a message of the search (initial fitness, why it stopped) to the callbacks that take notes."""
+        for callback in self.callbacks:
+            note = getattr(callback, "note", None)
+            if note is not None:
+                note(message)
+
+    def wants(self, generation: int) -> bool:
+        """Whether a callback takes the GenerationStats of generation."""
+        return any(self._takes(callback, generation) for callback in self.callbacks)
+
+    def report(self, generation: int, evaluations: int, best_fitness: float, fitness: Sequence[float],
+               population: Sequence[Solution] = None, fitness_cache: LRUCache = None,
+               programmer_cache: LRUCache = None, release: int = None, diversity: float = None,
+               current_fitness: float = None, temperature: float = None) -> None:
+        """
+        Record a generation that made evaluations fitness evaluations and scored fitness. The
+        diversity is the one of population when given.
+        """
+        self.evaluations += evaluations
+        callbacks = [callback for callback in self.callbacks if self._takes(callback, generation)]
+        if not callbacks:
+            return
+        elapsed = time.perf_counter() - self._started
+        stats = GenerationStats(
+            algorithm=self.algorithm,
+            generation=generation,
+            best_fitness=best_fitness,
+            mean_fitness=statistics.fmean(fitness) if fitness else best_fitness,
+            worst_fitness=min(fitness) if fitness else best_fitness,
+            diversity=population_diversity(population) if population else diversity,
+            evaluations=self.evaluations,
+            evaluations_per_second=self.evaluations / elapsed if elapsed > 0 else 0.0,
+            elapsed=elapsed,
+            fitness_cache_hit_rate=fitness_cache.hit_rate if fitness_cache is not None else None,
+            programmer_cache_hit_rate=programmer_cache.hit_rate if programmer_cache is not None else None,
+            release=release,
+            current_fitness=current_fitness,
+            temperature=temperature,
+        )
+        for callback in callbacks:
+            callback(stats)
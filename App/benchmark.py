@@ -0,0 +1,181 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+from load_data import *
+from solution import Solution
+from genome import Genome
+from task_table import TaskTable
+from generate_data import generate_dataset
+from algorithms.greedy import fix_dependencies, greedy, release_greedy
+from algorithms.fitness_function import fitness_function
+from algorithms.batch_fitness import batch_fitness_function
+from algorithms.delta_fitness import DeltaEvaluator
+from algorithms.moves import random_move_neighbor, random_swap_neighbor
+from algorithms.hill_climbing import hill_climbing
+from algorithms.genetic import genetic
+from algorithms.stopping import StoppingCriteria
+
+# Whether a larger value of a metric is better
+HIGHER_IS_BETTER = {
+    "load_rows_per_s": True,
+    "snapshot_load_ms": False,
+    "fix_dependencies_ms": False,
+    "greedy_ms": False,
+    "release_greedy_ms": False,
+    "fitness_evals_per_s": True,
+    "batch_fitness_evals_per_s": True,
+    "delta_moves_per_s": True,
+    "clone_us": False,
+    "genome_clone_us": False,
+    "hill_climbing_evals_per_s": True,
+    "genetic_evals_per_s": True,
+}
+
+
+def time_call(function: Callable[[], object], min_time: float = 0.2, repeats: int = 3) -> float:
+    """Seconds per call of function: the best of repeats rounds of calls lasting at least min_time each."""
+    best = float('inf')
+    for _ in range(repeats):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def evaluations_per_second(run: Callable[[StoppingCriteria], object], repeats: int = 3) -> float:
+    """Fitness evaluations per second of a search, counted by its stopping criteria, best of repeats seeded runs."""
+    best = 0.0
+    for _ in range(repeats):
+        random.seed(0)
+        stopping = StoppingCriteria()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run(stopping)
+        best = max(best, stopping.evaluations / (time.perf_counter() - started))
+    return best
+
+
+def benchmark_size(num_tasks: int, data_dir: str, min_time: float = 0.2) -> Dict[str, float]:
+    """Measures every HIGHER_IS_BETTER metric on a generated dataset of num_tasks tasks."""
+    prefix = os.path.join(data_dir, f"synthetic_{num_tasks}")
+    tasks_file, programmers_file, releases_file = (f"{prefix}_tasks.csv", f"{prefix}_programmers.csv",
+                                                   f"{prefix}_releases.csv")
+    if not all(os.path.exists(path) for path in (tasks_file, programmers_file, releases_file)):
+        generate_dataset(prefix, num_tasks)
+    programmers = load_programmers_specs_from_file(programmers_file)
+    releases = load_releases_from_file(releases_file)
+    results = {}
+
+    # Loading
+    load_time = time_call(lambda: load_tasks_from_file(tasks_file), min_time)
+    results["load_rows_per_s"] = num_tasks / load_time
+    load_tasks_with_index(tasks_file)  # writes the snapshot
+    results["snapshot_load_ms"] = time_call(lambda: load_tasks_with_index(tasks_file), min_time) * 1e3
+    tasks, dep_index = load_tasks_with_index(tasks_file)
+    table = TaskTable.from_tasks(tasks, dep_index)
+
+    # Greedy planners
+    by_priority = sorted(tasks, key=lambda t: (t.priority, t.cost))
+    results["fix_dependencies_ms"] = time_call(lambda: fix_dependencies(by_priority.copy(), dep_index), min_time) * 1e3
+    results["greedy_ms"] = time_call(lambda: greedy(tasks, programmers, releases, dep_index=dep_index), min_time) * 1e3
+    results["release_greedy_ms"] = time_call(
+        lambda: release_greedy(tasks, programmers, releases, dep_index=dep_index), min_time) * 1e3
+
+    # Fitness evaluation
+    random.seed(0)
+    population = [Solution().initialize(programmers, tasks.copy(), "random") for _ in range(20)]
+    solution = population[0]
+    results["fitness_evals_per_s"] = 1 / time_call(
+        lambda: fitness_function(solution, tasks, releases, dep_index=dep_index), min_time)
+    results["batch_fitness_evals_per_s"] = len(population) / time_call(
+        lambda: batch_fitness_function(population, tasks, releases, table=table), min_time)
+    evaluator = DeltaEvaluator(solution, tasks, releases, table=table)
+    moves = [random_swap_neighbor(solution) for _ in range(500)] + [random_move_neighbor(solution) for _ in range(500)]
+    moves = [move for move in moves if move is not None]
+    results["delta_moves_per_s"] = len(moves) / time_call(
+        lambda: [evaluator.evaluate(move) for move in moves], min_time)
+
+    # Copies
+    genome = Genome.from_solution(solution)
+    results["clone_us"] = time_call(solution.clone, min_time) * 1e6
+    results["genome_clone_us"] = time_call(genome.clone, min_time) * 1e6
+
+    # Searches
+    results["hill_climbing_evals_per_s"] = evaluations_per_second(
+        lambda stopping: hill_climbing(tasks, programmers, releases, max_iterations=20, dep_index=dep_index,
+                                       stopping=stopping, callbacks=[]))
+    results["genetic_evals_per_s"] = evaluations_per_second(
+        lambda stopping: genetic(tasks, programmers, releases, population_size=50, generations=5,
+                                 dep_index=dep_index, stopping=stopping, callbacks=[]))
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Prints every metric next to its baseline and returns the ones worse by more than tolerance."""
+    regressions = []
+    print(f"{'Size':<10} {'Metric':<28} {'Baseline':>14} {'Current':>14} {'Change':>9}")
+    print(f"{'-'*80}")
+    for size, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(size, {}).get(metric)
+            if not reference:
+                print(f"{size:<10} {metric:<28} {'-':>14} {value:>14.2f} {'':>9}")
+                continue
+            change = value / reference - 1
+            worse = -change if HIGHER_IS_BETTER[metric] else change
+            flag = ""
+            if worse > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{metric} at {size} tasks")
+            print(f"{size:<10} {metric:<28} {reference:>14.2f} {value:>14.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', required=False, default=[1000, 10000])
+    parser.add_argument('-b', '--baseline', type=str, required=False, default='benchmarks/baseline.json')
+    parser.add_argument('--save_baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, required=False, default=0.25)
+    parser.add_argument('--min_time', type=float, required=False, default=0.2)
+    parser.add_argument('--data_dir', type=str, required=False, default='data/benchmark')
+
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {}
+    for size in args.sizes:
+        print(f"Benchmarking {size} tasks...")
+        results[str(size)] = benchmark_size(size, args.data_dir, args.min_time)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": baseline}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regressions of more than {args.tolerance:.0%}: " + ", ".join(regressions))
+        sys.exit(1)
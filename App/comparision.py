@@ -94,7 +94,7 @@ from algorithms.fitness_function import fitness_function
 from algorithms.slow_release_ga import call_slow_genetic
 
 if __name__ == '__main__':
-    tasks = load_tasks_from_file('data/ASF Jira 2025-12-08T08_13_21+0000.csv')
+    tasks, dep_index = load_tasks_with_index('data/ASF Jira 2025-12-08T08_13_21+0000.csv')
     programmers = load_programmers_specs_from_file('data/sample_programmers.csv')
     releases = load_releases_from_file('data/sample_releases.csv')
     
@@ -111,13 +111,13 @@ if __name__ == '__main__':
         try:
             match algo_name:
                 case 'greedy':
-                    solution = greedy(tasks, programmers, releases)
+                    solution = greedy(tasks, programmers, releases, dep_index=dep_index)
                 case 'hill_climbing':
-                    solution = hill_climbing(tasks, programmers, releases)
+                    solution = hill_climbing(tasks, programmers, releases, dep_index=dep_index)
                 case 'genetic':
-                    solution = genetic(tasks, programmers, releases)
+                    solution = genetic(tasks, programmers, releases, dep_index=dep_index)
                 case 'slow_release_GA':
-                    solution = call_slow_genetic(tasks, programmers, releases)
+                    solution = call_slow_genetic(tasks, programmers, releases, dep_index=dep_index)
                 case _:
                     raise ValueError(f'Unknown algorithm {algo_name}')
             
@@ -126,7 +126,7 @@ if __name__ == '__main__':
                 
                 # Calculate metrics and fitness
                 metrics = compare_release_plans(solution, tasks, releases)
-                fitness = fitness_function(solution, tasks, releases)
+                fitness = fitness_function(solution, tasks, releases, dep_index=dep_index)
                 metrics['fitness'] = round(fitness, 2)
                 
                 # Store results
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List
+
+import numpy as np
+
+from task import Task
+
+
+@dataclass(frozen=True)
+class DependencyIndex:
+    """
+    Dependency graph of the tasks in compressed sparse row (CSR) form, built once per dataset.
+
+    Attributes:
+        dep_ptr, dep_ids: Task t depends on dep_ids[dep_ptr[t]:dep_ptr[t + 1]].
+        rev_ptr, rev_ids: Tasks depending on t are rev_ids[rev_ptr[t]:rev_ptr[t + 1]].
+        level: Topological level, 0 for tasks without dependencies, -1 for tasks on or after a cycle.
+        component: Id of the weakly connected component of every task.
+    """
+    dep_ptr: np.ndarray
+    dep_ids: np.ndarray
+    rev_ptr: np.ndarray
+    rev_ids: np.ndarray
+    level: np.ndarray
+    component: np.ndarray
+
+    @property
+    def num_tasks(self) -> int:
+        return len(self.dep_ptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.dep_ids)
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Task]) -> DependencyIndex:
+        n = len(tasks)
+        deps = [[] for _ in range(n)]
+        for t in tasks:
+            deps[t.id] = [d.id for d in t.dependencies]
+        dep_ptr = np.zeros(n + 1, dtype=np.int64)
+        dep_ptr[1:] = np.cumsum([len(d) for d in deps])
+        dep_ids = np.fromiter((d for ds in deps for d in ds), dtype=np.int64, count=int(dep_ptr[-1]))
+
+        # reverse edges: stable sort of the edge list by dependency id
+        edge_tasks = np.repeat(np.arange(n, dtype=np.int64), np.diff(dep_ptr))
+        order = np.argsort(dep_ids, kind="stable")
+        rev_ids = edge_tasks[order]
+        rev_ptr = np.zeros(n + 1, dtype=np.int64)
+        rev_ptr[1:] = np.cumsum(np.bincount(dep_ids, minlength=n))
+
+        return cls(
+            dep_ptr=dep_ptr,
+            dep_ids=dep_ids,
+            rev_ptr=rev_ptr,
+            rev_ids=rev_ids,
+            level=_topological_levels(deps, rev_ptr.tolist(), rev_ids.tolist()),
+            component=_components(deps, rev_ptr.tolist(), rev_ids.tolist()),
+        )
+
+    def dependencies(self, task_id: int) -> np.ndarray:
+        return self.dep_ids[self.dep_ptr[task_id]:self.dep_ptr[task_id + 1]]
+
+    def dependents(self, task_id: int) -> np.ndarray:
+        return self.rev_ids[self.rev_ptr[task_id]:self.rev_ptr[task_id + 1]]
+
+    @cached_property
+    def edge_tasks(self) -> np.ndarray:
+        """For every edge, the task that has the dependency (parallel to dep_ids)."""
+        return np.repeat(np.arange(self.num_tasks, dtype=np.int64), np.diff(self.dep_ptr))
+
+    @cached_property
+    def lists(self):
+        """Plain list copies of (dep_ptr, dep_ids, rev_ptr, rev_ids) for pure-Python loops."""
+        return self.dep_ptr.tolist(), self.dep_ids.tolist(), self.rev_ptr.tolist(), self.rev_ids.tolist()
+
+    @cached_property
+    def edge_list(self) -> List[tuple]:
+        return list(zip(self.edge_tasks.tolist(), self.dep_ids.tolist()))
+
+    def count_violations(self, task_to_release: Dict[int, int]) -> int:
+        """
+        Number of edges whose task is planned while its dependency is unplanned or planned
+        in a later release.
+        """
+        violations = 0
+        for task_id, dep_id in self.edge_list:
+            t_release = task_to_release.get(task_id)
+            if t_release is None:
+                continue
+            dep_release = task_to_release.get(dep_id)
+            if dep_release is None or dep_release > t_release:
+                violations += 1
+        return violations
+
+    def count_violations_batch(self, task_release: np.ndarray, unassigned: int) -> np.ndarray:
+        """
+        count_violations for a (num_individuals, num_tasks) array of releases in which
+        unplanned tasks hold the value unassigned (larger than every release).
+        """
+        t_release = task_release[:, self.edge_tasks]
+        dep_release = task_release[:, self.dep_ids]
+        return ((t_release < unassigned) & (dep_release > t_release)).sum(axis=1)
+
+
+def _topological_levels(deps: List[List[int]], rev_ptr: List[int], rev_ids: List[int]) -> np.ndarray:
+    # Kahn's algorithm, a task's level is one more than the deepest of its dependencies
+    n = len(deps)
+    level = [0] * n
+    remaining = [len(d) for d in deps]
+    queue = deque(t for t in range(n) if remaining[t] == 0)
+    done = 0
+    while queue:
+        t = queue.popleft()
+        done += 1
+        for k in range(rev_ptr[t], rev_ptr[t + 1]):
+            parent = rev_ids[k]
+            level[parent] = max(level[parent], level[t] + 1)
+            remaining[parent] -= 1
+            if remaining[parent] == 0:
+                queue.append(parent)
+    if done < n:
+        for t in range(n):
+            if remaining[t] > 0:
+                level[t] = -1
+    return np.array(level, dtype=np.int64)
+
+
+def _components(deps: List[List[int]], rev_ptr: List[int], rev_ids: List[int]) -> np.ndarray:
+    n = len(deps)
+    component = [-1] * n
+    current = 0
+    for start in range(n):
+        if component[start] != -1:
+            continue
+        component[start] = current
+        stack = [start]
+        while stack:
+            t = stack.pop()
+            for other in deps[t] + rev_ids[rev_ptr[t]:rev_ptr[t + 1]]:
+                if component[other] == -1:
+                    component[other] = current
+                    stack.append(other)
+        current += 1
+    return np.array(component, dtype=np.int64)
@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import random
+import resource
+import statistics
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Dict, List
+
+from load_data import *
+from comparision import compare_release_plans
+from algorithms.genetic import genetic
+from algorithms.hill_climbing import hill_climbing
+from algorithms.greedy import greedy, release_greedy
+from algorithms.fitness_function import fitness_function
+from algorithms.slow_release_ga import call_slow_genetic
+from algorithms.island_ga import island_genetic
+from algorithms.local_search import simulated_annealing, tabu_search
+from algorithms.multi_start import multi_start_hill_climbing
+from algorithms.stopping import StoppingCriteria
+
+# Measurements of a run that are summarised over its seeds
+SUMMARY_FIELDS = ("fitness", "wall_time", "evaluations", "peak_rss_growth_mb", "sum_priorities", "high_priority_ratio",
+                  "total_work_hours", "max_programmer_hours", "workload_std_dev", "estimated_release_days")
+CSV_FIELDS = ("dataset", "algorithm", "seed") + SUMMARY_FIELDS + ("high_priority_count", "total_tasks_assigned",
+                                                                   "workload_variance")
+
+# Two-sided 95% quantiles of Student's t distribution for 1..30 degrees of freedom
+_T_95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131,
+         2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+
+def run_algorithm(algorithm: str, tasks, programmers, releases, dep_index, stopping: StoppingCriteria):
+    """Solution of one algorithm and the number of fitness evaluations it made (None when not counted)."""
+    match algorithm:
+        case 'greedy':
+            return greedy(tasks, programmers, releases, dep_index=dep_index), None
+        case 'release_greedy':
+            return release_greedy(tasks, programmers, releases, dep_index=dep_index), None
+        case 'hill_climbing':
+            solution = hill_climbing(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                     callbacks=[])
+        case 'multi_start_HC':
+            solution, results = multi_start_hill_climbing(tasks, programmers, releases,
+                                                          time_budget=stopping.time_budget, dep_index=dep_index)
+            return solution, sum(result.evaluations for result in results)
+        case 'tabu_search':
+            solution = tabu_search(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                   callbacks=[])
+        case 'simulated_annealing':
+            solution = simulated_annealing(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                           callbacks=[])
+        case 'genetic':
+            solution = genetic(tasks, programmers, releases, dep_index=dep_index, stopping=stopping, callbacks=[])
+        case 'island_GA':
+            return island_genetic(tasks, programmers, releases, dep_index=dep_index, callbacks=[]), None
+        case 'slow_release_GA':
+            solution = call_slow_genetic(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                         callbacks=[])
+        case _:
+            raise ValueError(f'Unknown algorithm {algorithm}')
+    return solution, stopping.evaluations
+
+
+def run_experiment(job: dict) -> dict:
+    """
+    One run of an algorithm on a dataset with a seed. The algorithm's output is discarded.
+    peak_rss_growth_mb is how far the run (loading included) raised the peak RSS of the calling
+    process above its peak when the run started. A forked process starts with the memory it
+    shares with its parent, which is not the run's, and the processes the run starts itself
+    (island_GA, parallel evaluation) are not counted.
+    """
+    # ru_maxrss is in kilobytes on Linux
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tasks, dep_index = load_tasks_with_index(job["dataset"])
+    programmers = load_programmers_specs_from_file(job["programmers_file"])
+    releases = load_releases_from_file(job["releases_file"])
+    stopping = StoppingCriteria(time_budget=job["time_budget"])
+
+    random.seed(job["seed"])
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution, evaluations = run_algorithm(job["algorithm"], tasks, programmers, releases, dep_index, stopping)
+    wall_time = time.perf_counter() - started
+
+    metrics = compare_release_plans(solution, tasks, releases)
+    workloads = metrics.pop("programmer_workloads")
+    return {
+        "dataset": job["dataset"],
+        "algorithm": job["algorithm"],
+        "seed": job["seed"],
+        "fitness": fitness_function(solution, tasks, releases, dep_index=dep_index),
+        "wall_time": round(wall_time, 4),
+        "evaluations": evaluations,
+        "peak_rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024, 1),
+        **metrics,
+        "programmer_workloads": workloads,
+    }
+
+
+def _experiment_process(conn, job: dict) -> None:
+    try:
+        conn.send(run_experiment(job))
+    except Exception:
+        conn.send({"error": traceback.format_exc(), **job})
+    conn.close()
+
+
+def run_in_processes(jobs: List[dict], workers: int):
+    """
+    Yields the results of run_experiment for jobs as they finish, running up to workers jobs at
+    a time, each in a new process. Unlike pool workers, these processes may start their own
+    (island_GA, parallel evaluation). A failed run yields its job with the traceback as "error".
+    """
+    pending = list(reversed(jobs))
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_experiment_process, args=(child_conn, pending.pop()))
+            process.start()
+            child_conn.close()
+            running[parent_conn] = process
+        for conn in wait(list(running)):
+            process = running.pop(conn)
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = {"error": f"process exited with code {process.exitcode}"}
+            conn.close()
+            process.join()
+            yield result
+
+
+def confidence_interval(values: List[float]) -> float:
+    """Half-width of the 95% confidence interval of the mean of values (0 for a single value)."""
+    if len(values) < 2:
+        return 0.0
+    t = _T_95[len(values) - 2] if len(values) - 1 <= len(_T_95) else 1.96
+    return t * statistics.stdev(values) / len(values) ** 0.5
+
+
+def summarize(results: List[dict]) -> List[dict]:
+    """Mean, median and 95% confidence interval of every SUMMARY_FIELDS value per dataset and algorithm."""
+    groups: Dict[tuple, List[dict]] = {}
+    for result in results:
+        groups.setdefault((result["dataset"], result["algorithm"]), []).append(result)
+    summary = []
+    for (dataset, algorithm), runs in groups.items():
+        row = {"dataset": dataset, "algorithm": algorithm, "runs": len(runs)}
+        for field in SUMMARY_FIELDS:
+            values = [run[field] for run in runs if run[field] is not None]
+            if not values:
+                continue
+            row[f"{field}_mean"] = round(statistics.mean(values), 4)
+            row[f"{field}_median"] = round(statistics.median(values), 4)
+            row[f"{field}_ci95"] = round(confidence_interval(values), 4)
+        summary.append(row)
+    return summary
+
+
+def print_summary(summary: List[dict]) -> None:
+    print(f"\n{'='*140}")
+    print("SUMMARY COMPARISON - MEAN ± 95% CI (MEDIAN)")
+    print(f"{'='*140}\n")
+    columns = (("fitness", "Fitness"), ("wall_time", "Time (s)"), ("evaluations", "Evaluations"),
+               ("peak_rss_growth_mb", "RSS growth (MB)"), ("sum_priorities", "Sum Prio"))
+    print(f"{'Dataset':<20} {'Algorithm':<20} {'Runs':<5} " + " ".join(f"{title:<30}" for _, title in columns))
+    print(f"{'-'*140}")
+    for row in summary:
+        cells = []
+        for field, _ in columns:
+            if f"{field}_mean" in row:
+                cells.append(f"{row[f'{field}_mean']:.2f} ± {row[f'{field}_ci95']:.2f} ({row[f'{field}_median']:.2f})")
+            else:
+                cells.append("-")
+        print(f"{row['dataset'][-20:]:<20} {row['algorithm']:<20} {row['runs']:<5} " + " ".join(f"{c:<30}" for c in cells))
+    print(f"{'='*140}\n")
+
+
+def run_experiments(algorithms: List[str], seeds: List[int], datasets: List[str], programmers_file: str,
+                    releases_file: str, output: str, workers: int = 1, time_budget: float = None) -> List[dict]:
+    """
+    Runs every algorithm x seed x dataset combination, workers runs at a time and each in its
+    own process, streams the results to output.jsonl and output.csv as the runs finish and
+    writes their summary to output_summary.csv.
+    """
+    jobs = [{"algorithm": algorithm, "seed": seed, "dataset": dataset, "programmers_file": programmers_file,
+             "releases_file": releases_file, "time_budget": time_budget}
+            for dataset in datasets for algorithm in algorithms for seed in seeds]
+    # parse every dataset once up front, so that the runs load its snapshot
+    for dataset in datasets:
+        load_tasks_with_index(dataset)
+
+    results = []
+    with open(f"{output}.jsonl", "w", encoding="utf-8") as jsonl_file, \
+            open(f"{output}.csv", "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for done, result in enumerate(run_in_processes(jobs, workers), start=1):
+            if "error" in result:
+                print(f"[{done}/{len(jobs)}] Error running {result.get('algorithm')} seed {result.get('seed')} on "
+                      f"{result.get('dataset')}:\n{result['error']}")
+                continue
+            results.append(result)
+            jsonl_file.write(json.dumps(result) + "\n")
+            jsonl_file.flush()
+            writer.writerow(result)
+            csv_file.flush()
+            print(f"[{done}/{len(jobs)}] {result['algorithm']} seed {result['seed']} on "
+                  f"{result['dataset']}: fitness {round(result['fitness'], 2)} in {result['wall_time']}s")
+
+    summary = summarize(results)
+    with open(f"{output}_summary.csv", "w", newline="", encoding="utf-8") as f:
+        fieldnames = ["dataset", "algorithm", "runs"]
+        fieldnames += [f"{field}_{stat}" for field in SUMMARY_FIELDS for stat in ("mean", "median", "ci95")]
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(summary)
+    print_summary(summary)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-a', '--algorithms', type=str, nargs='+', required=False,
+                        default=['greedy', 'hill_climbing', 'genetic', 'slow_release_GA'])
+    parser.add_argument('-s', '--seeds', type=int, required=False, default=5)
+    parser.add_argument('-t', '--tasks_files', type=str, nargs='+', required=False,
+                        default=['data/ASF Jira 2025-12-08T08_13_21+0000.csv'])
+    parser.add_argument('-r', '--releases_file', type=str, required=False, default='data/sample_releases.csv')
+    parser.add_argument('-p', '--programmers_file', type=str, required=False, default='data/sample_programmers.csv')
+    parser.add_argument('-w', '--workers', type=int, required=False, default=1)
+    parser.add_argument('-o', '--output', type=str, required=False, default='experiments')
+    parser.add_argument('--time_budget', type=float, required=False, default=None)
+
+    args = parser.parse_args()
+    run_experiments(args.algorithms, list(range(args.seeds)), args.tasks_files, args.programmers_file,
+                    args.releases_file, args.output, workers=args.workers, time_budget=args.time_budget)
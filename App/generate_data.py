@@ -0,0 +1,124 @@
+import argparse
+import csv
+import math
+import random
+from datetime import date, timedelta
+from typing import Dict, Tuple
+
+from load_data import TASK_COLUMNS, priority_map
+
+# Share of every priority in the Apache exports (livy and Zookeeper)
+DEFAULT_PRIORITY_MIX = {"Blocker": 3, "Critical": 4, "Major": 72, "Minor": 15, "Trivial": 6}
+EFFICIENCIES = (0.5, 1.0, 1.0, 1.5, 2.0)
+
+
+def parse_priority_mix(text: str) -> Dict[str, float]:
+    """Priority weights from "Blocker=3,Major=70,..." (names of load_data.priority_map)."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in priority_map:
+            raise ValueError(f"Unknown priority: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def generate_tasks_file(file_path: str, num_tasks: int, dependency_density: float = 0.05,
+                        priority_mix: Dict[str, float] = None, time_spent_ratio: float = 0.4,
+                        project: str = "SYN", seed: int = 0) -> None:
+    """
+    Writes a Jira-shaped export of num_tasks issues with the columns read by load_data.
+
+    A dependency_density share of the issues has a parent among the 1000 issues before it, given
+    half of the time as Parent id and half as Inward issue link (Child-Issue). Priorities are
+    drawn with the weights of priority_mix, and a time_spent_ratio share of the issues has its
+    time spent (in seconds), the others get it imputed from their text length when loaded.
+    Rows are written one at a time, so any size fits in memory.
+    """
+    rng = random.Random(seed)
+    mix = priority_mix or DEFAULT_PRIORITY_MIX
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    first_id = 10000000
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(TASK_COLUMNS)
+        for i in range(num_tasks):
+            parent_id = ""
+            parent_key = ""
+            if i > 0 and rng.random() < dependency_density:
+                parent = rng.randrange(max(0, i - 1000), i)
+                if rng.random() < 0.5:
+                    parent_id = str(first_id + parent)
+                else:
+                    parent_key = f"{project}-{parent + 1}"
+            time_spent = ""
+            if rng.random() < time_spent_ratio:
+                time_spent = str(int(rng.lognormvariate(math.log(3000), 1.0)))
+            summary_length = rng.randint(20, 120)
+            description_length = int(rng.lognormvariate(math.log(300), 1.0))
+            writer.writerow((
+                f"{project}-{i + 1}",
+                str(first_id + i),
+                rng.choices(names, weights)[0],
+                time_spent,
+                parent_id,
+                parent_key,
+                "s" * summary_length,
+                "d" * description_length,
+            ))
+
+
+def generate_programmers_file(file_path: str, num_programmers: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "efficiency"))
+        for i in range(num_programmers):
+            writer.writerow((f"Programmer {i + 1}", rng.choice(EFFICIENCIES)))
+
+
+def generate_releases_file(file_path: str, num_releases: int, working_days: int = 10,
+                           start: date = date(2025, 1, 1)) -> None:
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("start_date", "end_date", "working_days"))
+        for _ in range(num_releases):
+            end = start + timedelta(days=working_days - 1)
+            writer.writerow((start.isoformat(), end.isoformat(), working_days))
+            start = end + timedelta(days=1)
+
+
+def generate_dataset(prefix: str, num_tasks: int, num_programmers: int = None, num_releases: int = 6,
+                     dependency_density: float = 0.05, priority_mix: Dict[str, float] = None,
+                     time_spent_ratio: float = 0.4, seed: int = 0) -> Tuple[str, str, str]:
+    """
+    Writes prefix_tasks.csv, prefix_programmers.csv and prefix_releases.csv and returns their paths.
+    By default there is one programmer per 500 tasks (at least 4), so the releases cannot take every task.
+    """
+    if num_programmers is None:
+        num_programmers = max(4, num_tasks // 500)
+    paths = (f"{prefix}_tasks.csv", f"{prefix}_programmers.csv", f"{prefix}_releases.csv")
+    generate_tasks_file(paths[0], num_tasks, dependency_density, priority_mix, time_spent_ratio, seed=seed)
+    generate_programmers_file(paths[1], num_programmers, seed)
+    generate_releases_file(paths[2], num_releases)
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--tasks', type=int, required=False, default=10000)
+    parser.add_argument('--programmers', type=int, required=False, default=None)
+    parser.add_argument('--releases', type=int, required=False, default=6)
+    parser.add_argument('--dependency_density', type=float, required=False, default=0.05)
+    parser.add_argument('--priority_mix', type=str, required=False, default=None)
+    parser.add_argument('--time_spent_ratio', type=float, required=False, default=0.4)
+    parser.add_argument('--seed', type=int, required=False, default=0)
+    parser.add_argument('-o', '--output', type=str, required=False, default='data/synthetic')
+
+    args = parser.parse_args()
+    paths = generate_dataset(args.output, args.tasks, args.programmers, args.releases, args.dependency_density,
+                             parse_priority_mix(args.priority_mix) if args.priority_mix else None,
+                             args.time_spent_ratio, args.seed)
+    print("Generated", ", ".join(paths))
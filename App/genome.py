@@ -0,0 +1,147 @@
+from __future__ import annotations
+from array import array
+from collections.abc import MutableSequence
+from dataclasses import dataclass
+from itertools import chain
+from typing import List, Tuple
+
+from programmer import Programmer
+from solution import Solution
+
+
+@dataclass
+class Genome:
+    """
+    Compact representation of a Solution: the work plans of all programmers concatenated into
+    one array('i'), programmer p's plan being plans[offsets[p]:offsets[p + 1]].
+
+    clone() copies the two buffers, and as_solution() gives the usual Solution/Programmer API
+    on top of them, with PlanView work plans that read and write the buffers.
+    """
+    plans: array
+    offsets: array
+    programmers_specs: Tuple[Tuple[str, float], ...]
+
+    @classmethod
+    def from_solution(cls, solution: Solution) -> Genome:
+        if solution.genome is not None:
+            return solution.genome.clone()
+        offsets = array("i", [0])
+        for p in solution.programmers:
+            offsets.append(offsets[-1] + len(p.work_plan))
+        return cls(
+            plans=array("i", chain.from_iterable(p.work_plan for p in solution.programmers)),
+            offsets=offsets,
+            programmers_specs=tuple((p.name, p.efficiency) for p in solution.programmers),
+        )
+
+    @property
+    def num_programmers(self) -> int:
+        return len(self.offsets) - 1
+
+    def clone(self) -> Genome:
+        return Genome(plans=self.plans[:], offsets=self.offsets[:], programmers_specs=self.programmers_specs)
+
+    def copy_from(self, other: Genome) -> Genome:
+        """Overwrite the buffers with other's, keeping the existing arrays (and views on them)."""
+        self.plans[:] = other.plans
+        self.offsets[:] = other.offsets
+        return self
+
+    def plan(self, p: int) -> List[int]:
+        return self.plans[self.offsets[p]:self.offsets[p + 1]].tolist()
+
+    def splice(self, p: int, start: int, stop: int, values) -> None:
+        """Replace plans[start:stop], inside programmer p's plan, by values and shift the next plans."""
+        values = values if isinstance(values, array) else array("i", values)
+        self.plans[start:stop] = values
+        delta = len(values) - (stop - start)
+        if delta:
+            for q in range(p + 1, len(self.offsets)):
+                self.offsets[q] += delta
+
+    def as_solution(self) -> Solution:
+        """Solution whose work plans are views of this genome, clone() of it copies the genome."""
+        programmers = [Programmer(name=name, efficiency=efficiency, work_plan=PlanView(self, p))
+                       for p, (name, efficiency) in enumerate(self.programmers_specs)]
+        return Solution(programmers=programmers, genome=self)
+
+    def to_solution(self) -> Solution:
+        """Independent Solution with plain list work plans."""
+        programmers = [Programmer(name=name, efficiency=efficiency, work_plan=self.plan(p))
+                       for p, (name, efficiency) in enumerate(self.programmers_specs)]
+        return Solution(programmers=programmers)
+
+
+class PlanView(MutableSequence):
+    """List-like view of one programmer's work plan inside a Genome."""
+    __slots__ = ("genome", "index")
+
+    def __init__(self, genome: Genome, index: int):
+        self.genome = genome
+        self.index = index
+
+    def _bounds(self) -> Tuple[int, int]:
+        offsets = self.genome.offsets
+        return offsets[self.index], offsets[self.index + 1]
+
+    def _position(self, i: int, start: int, stop: int) -> int:
+        if i < 0:
+            i += stop - start
+        if not 0 <= i < stop - start:
+            raise IndexError("work plan index out of range")
+        return start + i
+
+    def __len__(self) -> int:
+        start, stop = self._bounds()
+        return stop - start
+
+    def __iter__(self):
+        start, stop = self._bounds()
+        return iter(self.genome.plans[start:stop])
+
+    def __getitem__(self, i):
+        start, stop = self._bounds()
+        if isinstance(i, slice):
+            return self.genome.plans[start:stop][i].tolist()
+        return self.genome.plans[self._position(i, start, stop)]
+
+    def __setitem__(self, i, value) -> None:
+        start, stop = self._bounds()
+        if not isinstance(i, slice):
+            self.genome.plans[self._position(i, start, stop)] = value
+            return
+        first, last, step = i.indices(stop - start)
+        if step == 1:
+            self.genome.splice(self.index, start + first, start + max(first, last), value)
+        else:
+            plan = self.genome.plans[start:stop]
+            plan[i] = array("i", value)
+            self.genome.plans[start:stop] = plan
+
+    def __delitem__(self, i) -> None:
+        start, stop = self._bounds()
+        if isinstance(i, slice):
+            plan = self.genome.plans[start:stop]
+            del plan[i]
+            self.genome.splice(self.index, start, stop, plan)
+        else:
+            position = self._position(i, start, stop)
+            self.genome.splice(self.index, position, position + 1, ())
+
+    def insert(self, i: int, value: int) -> None:
+        start, stop = self._bounds()
+        position = start + max(0, min(i + (stop - start) if i < 0 else i, stop - start))
+        self.genome.splice(self.index, position, position, (value,))
+
+    def copy(self) -> List[int]:
+        start, stop = self._bounds()
+        return self.genome.plans[start:stop].tolist()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PlanView, list)):
+            return self.copy() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
@@ -1,9 +1,18 @@
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+import numpy as np
 
 from task import Task
 from release import Release
+from dependency_index import DependencyIndex
 
 import csv
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import zipfile
 from datetime import datetime
 import math
 
@@ -19,66 +28,267 @@ priority_map = {
 }
 
 
-def load_tasks_from_file(file_path: str) -> List[Task]:
-    # Get Tasks from the CSV file taken from the Apache JIRA dataset
+# Columns of the Jira export read by parse_tasks_file
+TASK_COLUMNS = (
+    "Issue key",
+    "Issue id",
+    "Priority",
+    "Time Spent",
+    "Parent id",
+    "Inward issue link (Child-Issue)",
+    "Summary",
+    "Description",
+)
+
+
+def _column_indices(header: List[str], columns) -> List[int]:
+    # position of every column in the header, the last one when a name repeats
+    # (as csv.DictReader keeps the last value), -1 when it is missing
+    positions = {name: i for i, name in enumerate(header)}
+    return [positions.get(name, -1) for name in columns]
+
+
+@dataclass
+class TaskExport:
+    """
+    Rows of one Jira export, with time spent imputed, before they get task ids.
+    Every attribute is a list with one entry per row.
+    """
+    keys: List[str]
+    issue_ids: List[str]
+    costs: List[int]
+    priorities: List[int]
+    parent_ids: List[str]
+    parent_keys: List[str]
+
+
+def parse_tasks_file(file_path: str) -> TaskExport:
+    # Get the rows of the CSV file taken from the Apache JIRA dataset.
+    # Rows are streamed and only the needed columns are kept, the text columns as their length.
     if not file_path:
         raise ValueError("tasks_file path is empty.")
-    rows = []
+    keys = []
+    issue_ids = []
+    costs = []
+    priorities = []
+    parent_ids = []
+    parent_keys = []
+    # number of tasks with both text and time spent, and the sums of their log1p(text length)
+    # and time spent, to impute the others
+    fitted = 0
+    x_sum = 0.0
+    y_sum = 0
+    missing = []  # (task index, log1p(text length)) of the tasks with text but no time spent
     with open(file_path, newline="", encoding="utf-8") as f:
-        tmp = csv.DictReader(f)
-        for line in tmp:
-            issue_key = (line.get("Issue key") or "").strip()
-            issue_id = (line.get("Issue id") or "").strip()
-            priority = priority_map.get(line.get("Priority", ""), 4)
-            time_spent = (line.get("Time Spent") or "").strip()
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = _column_indices(header, TASK_COLUMNS)
+
+        for row in reader:
+            if not row:
+                continue
+            key, issue_id, priority, time_spent, parent_id, parent_key, summary, description = (
+                row[i] if 0 <= i < len(row) else "" for i in columns)
+            i = len(keys)
+            keys.append(key.strip())
+            issue_ids.append(issue_id.strip())
+            priorities.append(priority_map.get(priority, 4))
+            parent_ids.append(parent_id.strip())
+            parent_keys.append(parent_key.strip())
+            desc_length = len(summary.strip()) + len(description.strip())
+
+            time_spent = time_spent.strip()
             if time_spent == "":
-                time_spent = None
+                costs.append(None)
+                if desc_length > 0:
+                    missing.append((i, math.log1p(desc_length)))
             else:
-                time_spent = int(float(time_spent)//60)
-            parent_id = (line.get("Parent id") or "").strip()
-            parent_key = (line.get("Inward issue link (Child-Issue)") or "").strip()
-            desc_lenght = len((line.get("Summary") or "").strip()) + len((line.get("Description") or "").strip())
-            rows.append([issue_key, time_spent, priority, issue_id, parent_id, parent_key, desc_lenght])
-    #Simulate "Time spent" for data without it
-    Yes_TS = [row for row in rows if row[1] is not None and row[6] > 0]
-    No_TS = [row for row in rows if row[1] is None and row[6] > 0]
-    if No_TS != []:
-        x = [math.log1p(row[6]) for row in Yes_TS]
-        y = [row[1] for row in Yes_TS]
-        x_av = sum(x)/len(x)
-        y_av = sum(y)/len(y)
-        preds = []
-        for row in No_TS:
-            try:
-                preds.append(math.log1p(row[6])/x_av)
-            except:
-                preds.append(0)
+                costs.append(int(float(time_spent)//60))
+                if desc_length > 0:
+                    fitted += 1
+                    x_sum += math.log1p(desc_length)
+                    y_sum += costs[i]
+
+    #Simulate "Time spent" for data without it, proportionally to the log of the text length
+    if missing:
+        if not fitted:
+            raise ValueError(f"{file_path} has no task with both time spent and a description to impute time spent from.")
+        x_av = x_sum/fitted
+        y_av = y_sum/fitted
+        preds = [x/x_av for _, x in missing]
         preds_av = sum(preds)/len(preds)
-        for row, pred in zip(No_TS, preds):
-            row[1] = int(pred*(y_av/preds_av))
-    #Create the tasks        
+        for (i, _), pred in zip(missing, preds):
+            costs[i] = int(pred*(y_av/preds_av))
+
+    return TaskExport(keys=keys, issue_ids=issue_ids, costs=costs, priorities=priorities,
+                      parent_ids=parent_ids, parent_keys=parent_keys)
+
+
+def merge_exports(exports: List[TaskExport]) -> List[Task]:
+    # Create the tasks of the rows of all exports, with ids 0..n-1 in row order.
+    # A row whose Issue key was already loaded from an earlier export is dropped (its Issue id
+    # then refers to the task kept), and parent links are resolved across all exports.
     tasks = []
     key_to_index = {}
     id_to_index = {}
-    for i in range(len(rows)):  
-        tasks.append(Task(id=i, name=rows[i][0], cost=rows[i][1], priority=rows[i][2], dependencies=[]))
-        key_to_index[rows[i][0]] = i
-        if rows[i][3] != "":
-            id_to_index[rows[i][3]] = i
-    for i in range(len(rows)):
+    links = []  # (task index, parent id, parent key) of every task
+    for export in exports:
+        export_keys = {}
+        for row, key in enumerate(export.keys):
+            index = key_to_index.get(key) if key != "" else None
+            if index is None:
+                index = len(tasks)
+                tasks.append(Task(id=index, name=key, cost=export.costs[row], priority=export.priorities[row],
+                                  dependencies=[]))
+                export_keys[key] = index
+                links.append((index, export.parent_ids[row], export.parent_keys[row]))
+            if export.issue_ids[row] != "":
+                id_to_index[export.issue_ids[row]] = index
+        key_to_index.update(export_keys)
+
+    for index, parent_id, parent_key in links:
         dep_indices = set()
-        
-        parent_id = rows[i][4]
-        if parent_id != "" and parent_id in id_to_index:
+        if parent_id in id_to_index:
             dep_indices.add(id_to_index[parent_id])
-        
-        parent_key = rows[i][5]
-        if parent_key and parent_key in key_to_index:
+        if parent_key != "" and parent_key in key_to_index:
             dep_indices.add(key_to_index[parent_key])
-        
         for dep_index in dep_indices:
-            tasks[i].dependencies.append(tasks[dep_index])   
-    return sorted(tasks, key=lambda t: t.id)
+            tasks[index].dependencies.append(tasks[dep_index])
+    return tasks
+
+
+def load_tasks_from_file(file_path: str) -> List[Task]:
+    # Get Tasks from the CSV file taken from the Apache JIRA dataset
+    return merge_exports([parse_tasks_file(file_path)])
+
+
+def load_tasks_from_files(file_paths: List[str], workers: int = None) -> List[Task]:
+    # Get the Tasks of several Jira exports as one backlog (see merge_exports). The files are
+    # parsed in workers processes, by default one per file up to the number of CPUs.
+    if not file_paths:
+        raise ValueError("tasks_file path is empty.")
+    if workers is None:
+        workers = min(len(file_paths), os.cpu_count() or 1)
+    if workers > 1 and len(file_paths) > 1:
+        with multiprocessing.Pool(min(workers, len(file_paths))) as pool:
+            exports = pool.map(parse_tasks_file, file_paths, chunksize=1)
+    else:
+        exports = [parse_tasks_file(file_path) for file_path in file_paths]
+    return merge_exports(exports)
+
+
+# Version of the snapshot layout and of what load_tasks_from_file computes, snapshots of another version are rebuilt
+SNAPSHOT_VERSION = 1
+_INDEX_ARRAYS = ("dep_ptr", "dep_ids", "rev_ptr", "rev_ids", "level", "component")
+
+
+def snapshot_path(file_path: str) -> str:
+    # the snapshot of a tasks file is stored next to it
+    return file_path + ".snapshot.npz"
+
+
+def _file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_snapshot(file_path: str, tasks: List[Task], dep_index: DependencyIndex, digest: str = None) -> None:
+    # writes the parsed tasks and their dependency index of file_path as a .npz snapshot,
+    # keyed on the size, mtime and content hash of file_path
+    stat = os.stat(file_path)
+    costs = [t.cost for t in tasks]
+    arrays = {
+        "version": np.array(SNAPSHOT_VERSION),
+        "source": np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64),
+        "digest": np.array(digest or _file_digest(file_path)),
+        "name": np.array([t.name for t in tasks], dtype=str),
+        "cost": np.array([-1 if c is None else c for c in costs], dtype=np.int64),
+        "cost_missing": np.array([c is None for c in costs], dtype=bool),
+        "priority": np.array([t.priority for t in tasks], dtype=np.int64),
+    }
+    for name in _INDEX_ARRAYS:
+        arrays[name] = getattr(dep_index, name)
+    # written to a temporary file first, so that concurrent runs never read a partial snapshot
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, snapshot_path(file_path))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(file_path: str) -> Tuple[List[Task], DependencyIndex]:
+    # tasks and dependency index of file_path from its snapshot, None when there is no snapshot
+    # of the current file. A snapshot whose mtime differs is still used (and its key refreshed)
+    # when the content hash matches.
+    path = snapshot_path(file_path)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(file_path)
+    try:
+        with np.load(path, allow_pickle=False) as snapshot:
+            if int(snapshot["version"]) != SNAPSHOT_VERSION:
+                return None
+            size, mtime = snapshot["source"].tolist()
+            if size != stat.st_size:
+                return None
+            if mtime != stat.st_mtime_ns and str(snapshot["digest"]) != _file_digest(file_path):
+                return None
+            arrays = {name: snapshot[name] for name in snapshot.files}
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+    dep_index = DependencyIndex(**{name: arrays[name] for name in _INDEX_ARRAYS})
+    names = arrays["name"].tolist()
+    costs = arrays["cost"].tolist()
+    for i in np.flatnonzero(arrays["cost_missing"]).tolist():
+        costs[i] = None
+    priorities = arrays["priority"].tolist()
+    tasks = [Task(id=i, name=names[i], cost=costs[i], priority=priorities[i], dependencies=[])
+             for i in range(len(names))]
+    dep_ptr, dep_ids, _, _ = dep_index.lists
+    for i, task in enumerate(tasks):
+        task.dependencies.extend(tasks[d] for d in dep_ids[dep_ptr[i]:dep_ptr[i + 1]])
+    if mtime != stat.st_mtime_ns:
+        _try_save_snapshot(file_path, tasks, dep_index, str(arrays["digest"]))
+    return tasks, dep_index
+
+
+def _try_save_snapshot(file_path: str, tasks: List[Task], dep_index: DependencyIndex, digest: str = None) -> None:
+    # a snapshot that cannot be written (e.g. read-only data directory) only costs the next startup
+    try:
+        save_snapshot(file_path, tasks, dep_index, digest)
+    except OSError:
+        pass
+
+
+def load_tasks_with_index(file_path: Union[str, List[str]], use_snapshot: bool = True,
+                          workers: int = None) -> Tuple[List[Task], DependencyIndex]:
+    # loads tasks and compiles their dependency graph once for all algorithms,
+    # from the snapshot of the file when it is up to date, writing it otherwise.
+    # Several files are loaded with load_tasks_from_files, without snapshot.
+    if not file_path:
+        raise ValueError("tasks_file path is empty.")
+    if not isinstance(file_path, str):
+        if len(file_path) > 1:
+            tasks = load_tasks_from_files(file_path, workers)
+            return tasks, DependencyIndex.from_tasks(tasks)
+        file_path = file_path[0]
+    if use_snapshot:
+        loaded = load_snapshot(file_path)
+        if loaded is not None:
+            return loaded
+    tasks = load_tasks_from_file(file_path)
+    dep_index = DependencyIndex.from_tasks(tasks)
+    if use_snapshot:
+        _try_save_snapshot(file_path, tasks, dep_index)
+    return tasks, dep_index
 
 
 def load_releases_from_file(file_path: str) -> List[Release]:
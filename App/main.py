@@ -3,36 +3,106 @@ import argparse
 from load_data import *
 from algorithms.genetic import genetic
 from algorithms.hill_climbing import hill_climbing
-from algorithms.greedy import greedy
+from algorithms.greedy import greedy, release_greedy
 from algorithms.fitness_function import fitness_function
 from algorithms.slow_release_ga import call_slow_genetic
+from algorithms.island_ga import island_genetic
+from algorithms.local_search import simulated_annealing, tabu_search
+from algorithms.multi_start import multi_start_hill_climbing
+from algorithms.stopping import StoppingCriteria, fitness_upper_bound
+from algorithms.telemetry import JsonlSink, PrintSink
+from render import export_format, export_plan, plan_rows, render_text
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-a', '--algorithm', type=str, required=False, default="genetic") # "hill_climbing", "greedy"
-    parser.add_argument('-t', '--tasks_file', type=str, required=False, default='data/ASF Jira 2025-12-08T08_13_21+0000.csv')
+    parser.add_argument('-t', '--tasks_file', type=str, nargs='+', required=False, default='data/ASF Jira 2025-12-08T08_13_21+0000.csv')
     parser.add_argument('-r', '--releases_file', type=str, required=False, default='data/sample_releases.csv')
     parser.add_argument('-p', '--programmers_file', type=str, required=False, default='data/sample_programmers.csv')
+    parser.add_argument('-c', '--fitness_cache_size', type=int, required=False, default=0)
+    parser.add_argument('--programmer_cache_size', type=int, required=False, default=0)
+    parser.add_argument('-w', '--workers', type=int, required=False, default=1)
+    parser.add_argument('--islands', type=int, required=False, default=4)
+    parser.add_argument('--migration_interval', type=int, required=False, default=10)
+    parser.add_argument('--topology', type=str, required=False, default="ring")
+    parser.add_argument('-x', '--crossover', type=str, required=False, default="segment")
+    parser.add_argument('--time_budget', type=float, required=False, default=None)
+    parser.add_argument('--max_evaluations', type=int, required=False, default=None)
+    parser.add_argument('--stagnation', type=int, required=False, default=None)
+    parser.add_argument('--stop_at_bound', action='store_true')
+    parser.add_argument('--steady_state', type=int, required=False, default=0)
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--rolling', action='store_true')
+    parser.add_argument('--rolling_generations', type=int, required=False, default=25)
+    parser.add_argument('--starts', type=int, required=False, default=8)
+    parser.add_argument('--fit', type=str, required=False, default="worst")
+    parser.add_argument('--trace', type=str, required=False, default=None)
+    parser.add_argument('--quiet', action='store_true')
+    parser.add_argument('--no_color', action='store_true')
+    parser.add_argument('-e', '--export', type=str, required=False, default=None)
 
     args = parser.parse_args()
+    if args.export:
+        export_format(args.export)  # fail before the search on an unknown extension
 
-    tasks = load_tasks_from_file(args.tasks_file)
+    tasks, dep_index = load_tasks_with_index(args.tasks_file)
     programmers = load_programmers_specs_from_file(args.programmers_file)
     releases = load_releases_from_file(args.releases_file)
+    stopping = StoppingCriteria(
+        time_budget=args.time_budget,
+        max_evaluations=args.max_evaluations,
+        stagnation=args.stagnation,
+        target_fitness=fitness_upper_bound(tasks, programmers, releases) if args.stop_at_bound else None,
+    )
+    callbacks = [] if args.quiet else [PrintSink()]
+    trace = JsonlSink(args.trace) if args.trace else None
+    if trace is not None:
+        callbacks.append(trace)
     match args.algorithm:
         case 'greedy':
-            solution = greedy(tasks, programmers, releases)
+            solution = greedy(tasks, programmers, releases, dep_index=dep_index)
+        case 'release_greedy':
+            solution = release_greedy(tasks, programmers, releases, dep_index=dep_index, fit=args.fit)
         case 'hill_climbing':
-            solution = hill_climbing(tasks, programmers, releases)
+            solution = hill_climbing(tasks, programmers, releases, dep_index=dep_index, workers=args.workers,
+                                     stopping=stopping, callbacks=callbacks)
+        case 'multi_start_HC':
+            solution, _ = multi_start_hill_climbing(tasks, programmers, releases, starts=args.starts,
+                                                    time_budget=args.time_budget, dep_index=dep_index,
+                                                    workers=args.workers)
+        case 'tabu_search':
+            solution = tabu_search(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                   callbacks=callbacks)
+        case 'simulated_annealing':
+            solution = simulated_annealing(tasks, programmers, releases, dep_index=dep_index, stopping=stopping,
+                                           callbacks=callbacks)
         case 'genetic':
-            solution = genetic(tasks, programmers, releases)
+            solution = genetic(tasks, programmers, releases, dep_index=dep_index,
+                               fitness_cache_size=args.fitness_cache_size,
+                               programmer_cache_size=args.programmer_cache_size, workers=args.workers,
+                               crossover_type=args.crossover, stopping=stopping, steady_state=args.steady_state,
+                               compact=args.compact, callbacks=callbacks)
+        case 'island_GA':
+            solution = island_genetic(tasks, programmers, releases, islands=args.islands,
+                                      migration_interval=args.migration_interval, topology=args.topology,
+                                      crossover_type=args.crossover, dep_index=dep_index, callbacks=callbacks)
         case 'slow_release_GA':
-            solution = call_slow_genetic(tasks, programmers, releases)
+            solution = call_slow_genetic(tasks, programmers, releases, dep_index=dep_index,
+                                         fitness_cache_size=args.fitness_cache_size,
+                                         programmer_cache_size=args.programmer_cache_size, workers=args.workers,
+                                         stopping=stopping, rolling=args.rolling,
+                                         rolling_generations=args.rolling_generations, callbacks=callbacks)
         case _:
             raise ValueError(f'Unknown algorithm {args.algorithm}')
+    if trace is not None:
+        trace.close()
 
     if solution:
-        solution.print_solution(tasks, releases)
+        rows = plan_rows(solution, tasks, releases)
+        render_text(solution, rows, releases, color=not args.no_color)
+        if args.export:
+            export_plan(rows, args.export)
+            print(f"Release plan exported to {args.export}")
 
-    fitness = fitness_function(solution, tasks, releases)
+    fitness = fitness_function(solution, tasks, releases, dep_index=dep_index)
     print(f"\nFitness of release plan found by {args.algorithm}: {round(fitness, 2)}")
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from task import MAX_PRIORITY
 from style import Colors
 
@@ -19,14 +19,24 @@ class Programmer:
     def add_task(self, task_id: int) -> None:
         self.work_plan.append(task_id)
 
-    def evaluate_work_plan(self, tasks, releases, active_ids=None):
+    def evaluate_work_plan(self, tasks, releases, active_ids=None, schedule: List[Tuple[int, int, float, float]] = None):
+        """
+        Plans the tasks in work plan order, a task that does not fit in the time left carrying over to
+        the next release, and stops at the first one that fits in none. With schedule, (task id,
+        release, start minute, end minute) of every planned task is appended to it, in real working
+        minutes from the opening of the first release: a task starts when the previous one ends, or
+        when its release opens if that is later.
+        """
         priority_per_release = []
         time_left = 0.0
         plan_index = 0
         task_to_release = {}
+        opens = 0.0  # minute the release opens at
+        end = 0.0
         for i, release in enumerate(releases):
             release_priority = 0
-            time_left += release.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60
+            capacity = release.working_days * PROGRAMMING_HOURS_IN_WORK_DAY * 60
+            time_left += capacity
             while plan_index < len(self.work_plan):
                 task_id = self.work_plan[plan_index]
                 if active_ids != None and task_id not in active_ids:
@@ -38,9 +48,14 @@ class Programmer:
                     release_priority += MAX_PRIORITY + 1 - task.priority
                     task_to_release[task.id] = i
                     plan_index += 1
+                    if schedule is not None:
+                        start = max(end, opens)
+                        end = start + task.cost / self.efficiency
+                        schedule.append((task.id, i, start, end))
                 else:
                     break
             priority_per_release.append(release_priority)
+            opens += capacity
 
         overflowing = plan_index != len(self.work_plan)
         return priority_per_release, time_left, overflowing, task_to_release
\ No newline at end of file
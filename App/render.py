@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+from typing import IO, List, NamedTuple, TYPE_CHECKING
+
+import numpy as np
+
+from style import Colors
+
+if TYPE_CHECKING:
+    from release import Release
+    from solution import Solution
+    from task import Task
+
+EXPORT_FORMATS = ("json", "csv", "npz")
+
+
+class PlanRow(NamedTuple):
+    """
+    Place of one task in a release plan. Minutes are the programmer's real working minutes
+    (cost / efficiency) from the start of the first release; a task starts when the programmer's
+    previous task ends, or when its release opens if that is later. Tasks left out of every
+    release have release, start_minute and end_minute None.
+    """
+    task_id: int
+    task_name: str
+    priority: int
+    programmer: str
+    release: int
+    start_minute: float
+    end_minute: float
+
+
+def plan_rows(solution: Solution, tasks: List[Task], releases: List[Release]) -> List[PlanRow]:
+    """
+    Every task in work plan order, programmer by programmer, placed by the schedule of
+    Programmer.evaluate_work_plan, the pass fitness_function scores, so rows agree with the
+    fitness exactly. A programmer's tasks after the first one that fits in no release are left out.
+    As time left carries over, a task can end after its release closes.
+    """
+    rows = []
+    append = rows.append
+    for p in solution.programmers:
+        schedule = []
+        p.evaluate_work_plan(tasks, releases, schedule=schedule)
+        for task_id, release, start, end in schedule:
+            task = tasks[task_id]
+            append(PlanRow(task.id, task.name, task.priority, p.name, release, start, end))
+        for task_id in p.work_plan[len(schedule):]:
+            task = tasks[task_id]
+            append(PlanRow(task.id, task.name, task.priority, p.name, None, None, None))
+    return rows
+
+
+def render_text(solution: Solution, rows: List[PlanRow], releases: List[Release], out: IO[str] = None,
+                color: bool = True) -> None:
+    """
+    Writes the plan to out (stdout by default) release by release, one line per programmer with
+    a cell per task, coloured by priority unless color is False. Each line is built with one
+    join and written with one call.
+    """
+    if out is None:
+        out = sys.stdout
+    bold, header, endc = (Colors.BOLD, Colors.HEADER, Colors.ENDC) if color else ("", "", "")
+    colors = {}
+    index = {p.name: i for i, p in enumerate(solution.programmers)}
+    cells = [[[] for _ in solution.programmers] for _ in releases]
+    for task_id, _, priority, programmer, release, _, _ in rows:
+        if release is None:
+            continue
+        if color and priority not in colors:
+            colors[priority] = Colors.get_priority_color(priority)
+        cells[release][index[programmer]].append(f"{colors.get(priority, '')}|{f' Issue {task_id} ':^13}|{endc}")
+
+    for i, release in enumerate(releases):
+        out.write(f"{bold}{header}Release {i + 1}, from {release.start_day} to {release.end_date}{endc}\n")
+        for p, release_cells in zip(solution.programmers, cells[i]):
+            out.write(f"{p.name:10}: " + "".join(release_cells) + "\n")
+        out.write("-" * 60 + "\n")
+    out.flush()
+
+
+def export_format(file_path: str) -> str:
+    """Export format given by the extension of file_path."""
+    extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {extension or file_path} (expected one of {', '.join(EXPORT_FORMATS)})")
+    return extension
+
+
+def export_plan(rows: List[PlanRow], file_path: str, fmt: str = None) -> None:
+    """
+    Writes rows to file_path as a JSON list of objects, a CSV table or an .npz of one array per
+    column (release -1 and NaN minutes for the tasks left out). fmt defaults to the extension.
+    """
+    fmt = fmt or export_format(file_path)
+    match fmt:
+        case "json":
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump([row._asdict() for row in rows], f)
+        case "csv":
+            with open(file_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(PlanRow._fields)
+                writer.writerows(rows)
+        case "npz":
+            columns = list(zip(*rows)) if rows else [()] * len(PlanRow._fields)
+            task_ids, names, priorities, programmers, release, start, end = columns
+            with open(file_path, "wb") as f:
+                np.savez(
+                    f,
+                    task_id=np.array(task_ids, dtype=np.int64),
+                    task_name=np.array(names, dtype=str),
+                    priority=np.array(priorities, dtype=np.int64),
+                    programmer=np.array(programmers, dtype=str),
+                    release=np.array([-1 if r is None else r for r in release], dtype=np.int64),
+                    start_minute=np.array(start, dtype=np.float64),
+                    end_minute=np.array(end, dtype=np.float64),
+                )
+        case _:
+            raise ValueError(f"Unknown export format: {fmt}")
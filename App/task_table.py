@@ -0,0 +1,47 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from task import Task
+from dependency_index import DependencyIndex
+
+
+@dataclass(frozen=True)
+class TaskTable:
+    """
+    Column-oriented copy of the task list used by the vectorised algorithms.
+    Every array is indexed by task id.
+
+    Attributes:
+        cost: Time spent on each task in minutes.
+        priority: priority 1-8 (1 = highest, 8 = lowest)
+        dependencies: Dependency graph of the tasks.
+    """
+    cost: np.ndarray
+    priority: np.ndarray
+    dependencies: DependencyIndex
+
+    @property
+    def num_tasks(self) -> int:
+        return len(self.cost)
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Task], dep_index: DependencyIndex = None) -> TaskTable:
+        cost = np.zeros(len(tasks), dtype=np.int64)
+        priority = np.zeros(len(tasks), dtype=np.int64)
+        for t in tasks:
+            cost[t.id] = t.cost
+            priority[t.id] = t.priority
+        if dep_index is None:
+            dep_index = DependencyIndex.from_tasks(tasks)
+        return cls(cost=cost, priority=priority, dependencies=dep_index)
+
+    def active_mask(self, active_ids=None) -> np.ndarray:
+        """Boolean mask of active tasks; every task is active when active_ids is None."""
+        if active_ids is None:
+            return np.ones(self.num_tasks, dtype=bool)
+        mask = np.zeros(self.num_tasks, dtype=bool)
+        mask[np.fromiter(active_ids, dtype=np.int64, count=len(active_ids))] = True
+        return mask
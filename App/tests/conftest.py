@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules of App are imported as top-level modules, as when running the scripts from App
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
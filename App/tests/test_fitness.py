@@ -0,0 +1,90 @@
+import os
+import random
+
+import pytest
+
+from load_data import load_programmers_specs_from_file, load_releases_from_file, load_tasks_with_index
+from solution import Solution
+from algorithms.batch_fitness import batch_fitness_function
+from algorithms.delta_fitness import DeltaEvaluator
+from algorithms.fitness_function import count_dependency_violations, fitness_function
+from algorithms.moves import random_block_neighbor, random_move_neighbor, random_swap_neighbor
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def load(tasks_file: str):
+    tasks, dep_index = load_tasks_with_index(os.path.join(DATA, tasks_file))
+    programmers = load_programmers_specs_from_file(os.path.join(DATA, "sample_programmers.csv"))
+    releases = load_releases_from_file(os.path.join(DATA, "sample_releases.csv"))
+    return tasks, dep_index, programmers, releases
+
+
+@pytest.mark.parametrize("tasks_file", ["sample_tasks.csv", "livy.csv"])
+def test_batch_fitness_matches_fitness_function(tasks_file):
+    tasks, dep_index, programmers, releases = load(tasks_file)
+    random.seed(0)
+    population = [Solution().initialize(programmers, tasks.copy(), strategy)
+                  for strategy in ("random", "priority_cost", "priority_div_cost") for _ in range(5)]
+    active = {task.id for task in tasks[::2]}
+
+    for active_ids in (None, active):
+        batch = batch_fitness_function(population, tasks, releases, active_ids=active_ids)
+        for individual, fitness in zip(population, batch.tolist()):
+            assert fitness == pytest.approx(fitness_function(individual, tasks, releases, active_ids=active_ids),
+                                            rel=1e-9, abs=1e-6)
+
+
+def task_releases(solution, tasks, releases):
+    task_to_release = {}
+    for prog in solution.programmers:
+        task_to_release.update(prog.evaluate_work_plan(tasks, releases)[3])
+    return task_to_release
+
+
+def test_dependency_index_matches_task_dependencies():
+    tasks, dep_index, _, _ = load("livy.csv")
+    assert dep_index.num_edges > 0
+    for task in tasks:
+        assert dep_index.dependencies(task.id).tolist() == [d.id for d in task.dependencies]
+        assert dep_index.dependents(task.id).tolist() == [t.id for t in tasks
+                                                          if any(d.id == task.id for d in t.dependencies)]
+
+
+def test_delta_dependency_violations_match_task_dependencies():
+    tasks, dep_index, programmers, releases = load("livy.csv")
+    random.seed(0)
+    solution = Solution().initialize(programmers, tasks.copy(), "random")
+    evaluator = DeltaEvaluator(solution, tasks, releases, dep_index=dep_index)
+    violations = {evaluator.dep_violations}
+
+    for _ in range(300):
+        move = random.choice((random_swap_neighbor, random_move_neighbor, random_block_neighbor))(solution)
+        evaluator.commit(evaluator.evaluate(move))
+        task_to_release = task_releases(solution, tasks, releases)
+        assert evaluator.dep_violations == count_dependency_violations(tasks, task_to_release)
+        assert evaluator.dep_violations == dep_index.count_violations(task_to_release)
+        violations.add(evaluator.dep_violations)
+    assert len(violations) > 1
+
+
+@pytest.mark.parametrize("neighbor", [random_swap_neighbor, random_move_neighbor, random_block_neighbor])
+@pytest.mark.parametrize("active", [False, True])
+def test_delta_fitness_matches_fitness_function(neighbor, active):
+    tasks, dep_index, programmers, releases = load("livy.csv")
+    active_ids = {task.id for task in tasks[::2]} if active else None
+    random.seed(0)
+    solution = Solution().initialize(programmers, tasks.copy(), "random")
+    evaluator = DeltaEvaluator(solution, tasks, releases, active_ids=active_ids, dep_index=dep_index)
+
+    for _ in range(100):
+        move = neighbor(solution)
+        delta = evaluator.evaluate(move)
+        moved = solution.clone()
+        move.apply(moved)
+        expected = fitness_function(moved, tasks, releases, active_ids=active_ids, dep_index=dep_index)
+        assert delta.fitness == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+        evaluator.commit(delta)
+        assert solution == moved
+        assert evaluator.fitness() == pytest.approx(expected, rel=1e-9, abs=1e-6)
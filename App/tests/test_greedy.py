@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from task import Task
+from release import Release
+from dependency_index import DependencyIndex
+from algorithms.greedy import release_greedy
+
+
+def dependency_violations(solution, tasks, releases) -> int:
+    task_to_release = {}
+    for prog in solution.programmers:
+        task_to_release.update(prog.evaluate_work_plan(tasks, releases)[3])
+    return DependencyIndex.from_tasks(tasks).count_violations(task_to_release)
+
+
+def test_release_greedy_does_not_plan_dependent_in_time_left_from_earlier_release():
+    # D lands in release 1; T becomes ready then, and the programmer of B still has 10 minutes
+    # of release 0, where evaluate_work_plan would put T ahead of D
+    a = Task(id=0, name="A", cost=350, priority=1, dependencies=[])
+    b = Task(id=1, name="B", cost=350, priority=1, dependencies=[])
+    d = Task(id=2, name="D", cost=100, priority=2, dependencies=[])
+    t = Task(id=3, name="T", cost=5, priority=3, dependencies=[d])
+    tasks = [a, b, d, t]
+    programmers = [("P1", 1.0), ("P2", 1.0)]
+    releases = [Release(datetime(2025, 1, 1), datetime(2025, 1, 1), 1),
+                Release(datetime(2025, 1, 2), datetime(2025, 1, 2), 1)]
+
+    for fit in ("worst", "best"):
+        solution = release_greedy(tasks, programmers, releases, fit=fit)
+        assert sorted(task for prog in solution.programmers for task in prog.work_plan) == [0, 1, 2, 3]
+        assert dependency_violations(solution, tasks, releases) == 0
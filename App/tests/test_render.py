@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from task import Task
+from release import Release
+from programmer import Programmer
+from solution import Solution
+from render import plan_rows
+
+
+def test_plan_rows_do_not_start_tasks_before_their_release_opens():
+    # A leaves 10 minutes of release 0, B does not fit in them and is planned in release 1,
+    # which opens at minute 360
+    a = Task(id=0, name="A", cost=350, priority=1, dependencies=[])
+    b = Task(id=1, name="B", cost=100, priority=1, dependencies=[])
+    c = Task(id=2, name="C", cost=50, priority=1, dependencies=[])
+    solution = Solution(programmers=[Programmer(name="P1", efficiency=1.0, work_plan=[0, 1, 2])])
+    releases = [Release(datetime(2025, 1, 1), datetime(2025, 1, 1), 1),
+                Release(datetime(2025, 1, 2), datetime(2025, 1, 2), 1)]
+
+    rows = plan_rows(solution, [a, b, c], releases)
+    assert [(row.release, row.start_minute, row.end_minute) for row in rows] == [
+        (0, 0.0, 350.0), (1, 360.0, 460.0), (1, 460.0, 510.0)]